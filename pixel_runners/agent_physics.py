@@ -0,0 +1,203 @@
+import numpy as np
+import pygame
+from settings import *
+import game_clock
+from entity_store import round_like_rect
+from level import CONTACT_KINDS
+
+# Dash length in milliseconds, as in Player.dash
+DASH_DURATION = 200
+
+POWERUP_TYPES = ("speed_boost", "high_jump", "slow_motion")
+
+class AgentBatch:
+    # Player physics for many agents at once (bot tournaments, training).
+    # Every agent's position, velocity, ground flag, dash state and power-up
+    # expiry times are held in arrays, and one step applies Player.update's
+    # rules to all of them: input, dash and power-up timers, the horizontal
+    # move and its platform collisions, gravity and the vertical collisions,
+    # then the screen bounds.
+    #
+    # Collisions are resolved platform by platform in group order, as
+    # colliding_platforms yields them, with each test vectorized across the
+    # agents; an agent snapped against one platform is re-tested against the
+    # platforms after it. Positions are rounded the way pygame.Rect rounds,
+    # so an agent given the same input as a Player follows it exactly.
+    # Animation is not simulated.
+    def __init__(self, positions):
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 2)
+        self.count = len(positions)
+        self.width = PLAYER_WIDTH
+        self.height = PLAYER_HEIGHT
+        self.x = positions[:, 0].copy()
+        self.y = positions[:, 1].copy()
+        self.previous_x = self.x.copy()
+        self.previous_y = self.y.copy()
+        self.velocity_x = np.zeros(self.count)
+        self.velocity_y = np.zeros(self.count)
+        self.on_ground = np.zeros(self.count, dtype=np.bool_)
+        self.facing_right = np.ones(self.count, dtype=np.bool_)
+        self.speed = np.full(self.count, float(PLAYER_SPEED))
+        self.jump_power = np.full(self.count, float(PLAYER_JUMP_POWER))
+        self.gravity = PLAYER_GRAVITY
+
+        # Timers are due times in game clock milliseconds, inf when not running
+        self.dashing = np.zeros(self.count, dtype=np.bool_)
+        self.last_dash = np.zeros(self.count)
+        self.dash_end = np.full(self.count, np.inf)
+        self.powerup_end = {powerup_type: np.full(self.count, np.inf) for powerup_type in POWERUP_TYPES}
+
+        self.score = np.zeros(self.count, dtype=np.int64)
+        self.coins = np.zeros(self.count, dtype=np.int64)
+        self.checkpoints = np.zeros(self.count, dtype=np.int64)
+        self.collisions = np.zeros(self.count, dtype=np.int64)
+
+    def step(self, platforms, left, right, jump, dash):
+        # One Player.update for every agent. The inputs are boolean arrays
+        # of held keys, one entry per agent.
+        now = game_clock.get_ticks()
+        self.previous_x = self.x.copy()
+        self.previous_y = self.y.copy()
+        self.read_input(now, np.asarray(left), np.asarray(right), np.asarray(jump), np.asarray(dash))
+        self.run_timers(now)
+
+        # Platforms do not move during the players' update
+        bounds = np.array([(rect.left, rect.top, rect.right, rect.bottom)
+                           for rect in (platform.rect for platform in platforms)], dtype=np.float64).reshape(-1, 4)
+
+        # Move horizontally
+        self.x = round_like_rect(self.x + self.velocity_x)
+        self.on_ground[:] = False
+        self.collide_horizontal(bounds)
+
+        # Apply gravity and check for vertical collisions
+        self.velocity_y += self.gravity
+        self.y = round_like_rect(self.y + self.velocity_y)
+        self.collide_vertical(bounds)
+
+        # Keep agents within screen bounds
+        np.maximum(self.x, 0, out=self.x)
+        np.minimum(self.x, SCREEN_WIDTH - self.width, out=self.x)
+        below = self.y + self.height > SCREEN_HEIGHT
+        self.y[below] = SCREEN_HEIGHT - self.height
+        self.velocity_y[below] = 0
+        self.on_ground[below] = True
+
+    def read_input(self, now, left, right, jump, dash):
+        # Player.get_input: left wins over right, then jump, then dash
+        self.velocity_x = np.where(left, -self.speed, np.where(right, self.speed, 0.0))
+        self.facing_right = np.where(left, False, np.where(right, True, self.facing_right))
+
+        jumping = jump & self.on_ground
+        self.velocity_y[jumping] = -self.jump_power[jumping]
+        self.on_ground[jumping] = False
+
+        dashing = dash & (now - self.last_dash >= PLAYER_DASH_COOLDOWN)
+        self.dashing |= dashing
+        self.last_dash[dashing] = now
+        self.dash_end[dashing] = now + DASH_DURATION
+        self.velocity_x[dashing] = np.where(self.facing_right[dashing], PLAYER_DASH_POWER, -PLAYER_DASH_POWER)
+
+    def run_timers(self, now):
+        # Dash ends and power-up expiries, after input as in Player.update
+        ended = self.dash_end <= now
+        if ended.any():
+            self.dashing[ended] = False
+            self.velocity_x[ended] = 0
+            self.dash_end[ended] = np.inf
+
+        for powerup_type, end in self.powerup_end.items():
+            expired = end <= now
+            if expired.any():
+                end[expired] = np.inf
+                if powerup_type == "speed_boost":
+                    self.speed[expired] = PLAYER_SPEED
+                elif powerup_type == "high_jump":
+                    self.jump_power[expired] = PLAYER_JUMP_POWER
+
+    def overlaps(self, bounds, agents=slice(None)):
+        # (agents, platforms) matrix of pygame.Rect.colliderect results
+        x = self.x[agents, None]
+        y = self.y[agents, None]
+        return ((x < bounds[:, 2]) & (x + self.width > bounds[:, 0])
+                & (y < bounds[:, 3]) & (y + self.height > bounds[:, 1]))
+
+    def collide_horizontal(self, bounds):
+        hits = self.overlaps(bounds) & (self.velocity_x != 0)[:, None]
+        columns = np.flatnonzero(hits.any(axis=0))
+        while columns.size:
+            i = columns[0]
+            agents = np.flatnonzero(hits[:, i])
+            self.x[agents] = np.where(self.velocity_x[agents] > 0, bounds[i, 0] - self.width, bounds[i, 2])
+            # Snapped agents may now overlap platforms they missed before
+            hits[agents, i + 1:] = self.overlaps(bounds[i + 1:], agents)
+            columns = np.flatnonzero(hits[:, i + 1:].any(axis=0)) + i + 1
+
+    def collide_vertical(self, bounds):
+        # Only the first platform hit matters: it stops the agent
+        hits = self.overlaps(bounds) & (self.velocity_y != 0)[:, None]
+        hit = hits.any(axis=1)
+        if not hit.any():
+            return
+        agents = np.flatnonzero(hit)
+        first = hits[agents].argmax(axis=1)
+        falling = self.velocity_y[agents] > 0
+        self.y[agents] = np.where(falling, bounds[first, 1] - self.height, bounds[first, 3])
+        self.on_ground[agents[falling]] = True
+        self.velocity_y[agents] = 0
+
+    def apply_powerup(self, agent, powerup_type, duration):
+        self.powerup_end[powerup_type][agent] = game_clock.get_ticks() + duration
+        if powerup_type == "speed_boost":
+            self.speed[agent] = PLAYER_SPEED * SPEED_BOOST_MULTIPLIER
+        elif powerup_type == "high_jump":
+            self.jump_power[agent] = PLAYER_JUMP_POWER * HIGH_JUMP_MULTIPLIER
+
+    def collide_level(self, level):
+        # Level.update's coin, checkpoint, power-up and obstacle rules for
+        # every agent, in agent order; call after level.update. Contacts are
+        # found with one vectorized test against everything players can touch.
+        sprites = [(kind, sprite) for kind in CONTACT_KINDS for sprite in getattr(level, kind)]
+        if not sprites:
+            return
+        bounds = np.array([(sprite.rect.left, sprite.rect.top, sprite.rect.right, sprite.rect.bottom)
+                           for _, sprite in sprites], dtype=np.float64)
+        hits = self.overlaps(bounds)
+        taken = set()
+        for agent in np.flatnonzero(hits.any(axis=1)).tolist():
+            hit_obstacle = False
+            for i in np.flatnonzero(hits[agent]).tolist():
+                kind, sprite = sprites[i]
+                if i in taken:
+                    continue
+                if kind == "coins":
+                    sprite.kill()
+                    taken.add(i)
+                    self.score[agent] += sprite.value
+                    self.coins[agent] += 1
+                elif kind == "checkpoints":
+                    if sprite.activate():
+                        self.score[agent] += sprite.value
+                        self.checkpoints[agent] += 1
+                elif kind == "powerups":
+                    sprite.kill()
+                    taken.add(i)
+                    self.apply_powerup(agent, sprite.powerup_type, sprite.duration)
+                else:
+                    hit_obstacle = True
+
+            if hit_obstacle:
+                # Reset agent position (simple collision handling)
+                self.x[agent] -= 50
+                self.score[agent] -= 20  # Penalty for hitting obstacles
+                self.collisions[agent] += 1
+
+    def slow_motion(self):
+        # Whether any agent has slow motion running (see Game.time_scale)
+        return bool(np.isfinite(self.powerup_end["slow_motion"]).any())
+
+    def rect(self, agent):
+        return pygame.Rect(int(self.x[agent]), int(self.y[agent]), self.width, self.height)
+
+    def __len__(self):
+        return self.count
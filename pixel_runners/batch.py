@@ -0,0 +1,260 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import multiprocessing
+import random
+import time
+import pygame
+from settings import *
+import game_clock
+from controls import KeyState
+from level import Level
+from player import Player
+from replay import PLAYER_KEYS
+
+# Batch runs for level balancing: many headless Level + Player sessions
+# spread over a process pool. Each session is independent and seeded, so
+# the work splits across cores without any shared state; results stream
+# back to the parent as sessions finish.
+
+BOTS = ("bot", "random", "idle")
+
+class BotControls:
+    # Stand-in for a player's keyboard. "bot" holds a spot in the left part
+    # of the screen and jumps over obstacles ahead, "random" mashes keys and
+    # "idle" does nothing.
+    def __init__(self, player, level, style, rng):
+        self.player = player
+        self.level = level
+        self.style = style
+        self.rng = rng
+        self.left, self.right, self.jump, self.dash = PLAYER_KEYS[player.player_id]
+        self.held = KeyState()
+        self.hold_ticks = 0
+
+    def get_pressed(self):
+        if self.style == "random":
+            if self.hold_ticks <= 0:
+                keys = (self.left, self.right, self.jump, self.dash)
+                self.held = KeyState(key for key in keys if self.rng.random() < 0.3)
+                self.hold_ticks = self.rng.randint(10, 30)
+            self.hold_ticks -= 1
+            return self.held
+        if self.style != "bot":
+            return KeyState()
+
+        rect = self.player.rect
+        pressed = []
+        target_x = SCREEN_WIDTH // 3
+        if rect.centerx < target_x - 40:
+            pressed.append(self.right)
+        elif rect.centerx > target_x + 40:
+            pressed.append(self.left)
+
+        probe = pygame.Rect(rect.right, rect.top - 40, 200, rect.height + 40)
+        threat = any(obstacle.rect.colliderect(probe) for obstacle in self.obstacles())
+        if threat or self.rng.random() < 0.02:
+            pressed.append(self.jump)
+        if threat and self.rng.random() < 0.1:
+            pressed.append(self.dash)
+        return KeyState(pressed)
+
+    def obstacles(self):
+        # The level's obstacles with up to date rects: a batching store only
+        # writes the rects of on-screen sprites, and the probe reaches past
+        # the right edge of the screen
+        group = self.level.obstacles
+        store = group.store
+        if store.batched:
+            for obstacle in group:
+                if obstacle in store.slots:
+                    store.sync(obstacle)
+        return group
+
+def play_session(level_data, seed, bot, max_ticks, multiplayer=False, setup=None, on_tick=None):
+    # One seeded headless session of bot players, stepped in Game.update's
+    # per-tick order until max_ticks or Game.update's game-over rule.
+    # setup(level, players) runs before the first tick and on_tick(level,
+    # players) every tick once the players have moved, before the level
+    # scrolls. Returns the players, the ticks run, whether the game ended
+    # and the seconds spent in player updates.
+    rng = random.Random(seed)
+    random.seed(seed)
+    previous_clock = game_clock.set_clock(game_clock.SimulatedClock(1000 / PHYSICS_TICK_RATE))
+
+    level = Level(level_data, seed=seed, threaded=False)
+    players = [Player(100, SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT, 1)]
+    if multiplayer:
+        players.append(Player(200, SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT, 2))
+    for player in players:
+        player.controls = BotControls(player, level, bot, rng)
+
+    ticks = 0
+    game_over = False
+    update_time = 0.0
+    try:
+        if setup is not None:
+            setup(level, players)
+        while ticks < max_ticks:
+            start = time.perf_counter()
+            for player in players:
+                player.update(level.platforms)
+            update_time += time.perf_counter() - start
+            if on_tick is not None:
+                on_tick(level, players)
+            level.update(players)
+            game_clock.get_clock().advance()
+            ticks += 1
+
+            if all(player.rect.right >= SCREEN_WIDTH or player.rect.bottom >= SCREEN_HEIGHT for player in players):
+                game_over = True
+                break
+    finally:
+        level.close()
+        game_clock.set_clock(previous_clock)
+
+    return players, ticks, game_over, update_time
+
+def run_session(task):
+    # One pool task: a plain bot session, summarized
+    level_data, level_index, bot, seed, max_ticks, multiplayer = task
+    start = time.perf_counter()
+    players, ticks, game_over, _ = play_session(level_data, seed, bot, max_ticks, multiplayer)
+
+    return {
+        "level": level_index,
+        "level_name": level_data["name"],
+        "bot": bot,
+        "seed": seed,
+        "ticks": ticks,
+        "survived_seconds": ticks / PHYSICS_TICK_RATE,
+        "game_over": game_over,
+        "elapsed": time.perf_counter() - start,
+        "players": [
+            {
+                "player_id": player.player_id,
+                "score": player.score,
+                "coins": player.coins,
+                "checkpoints": player.checkpoints,
+                "collisions": player.collisions
+            }
+            for player in players
+        ]
+    }
+
+class Aggregator:
+    # Running totals per (level, bot), fed one result at a time
+    def __init__(self):
+        self.groups = {}
+        self.sessions = 0
+
+    def add(self, result):
+        self.sessions += 1
+        key = (result["level_name"], result["bot"])
+        totals = self.groups.setdefault(key, {"sessions": 0, "score": 0, "coins": 0, "checkpoints": 0,
+                                              "collisions": 0, "survived_seconds": 0.0, "finished": 0})
+        totals["sessions"] += 1
+        totals["survived_seconds"] += result["survived_seconds"]
+        totals["finished"] += not result["game_over"]
+        for player in result["players"]:
+            for field in ("score", "coins", "checkpoints", "collisions"):
+                totals[field] += player[field] / len(result["players"])
+
+    def report(self):
+        rows = []
+        for (level_name, bot), totals in sorted(self.groups.items()):
+            count = totals["sessions"]
+            rows.append({
+                "level": level_name,
+                "bot": bot,
+                "sessions": count,
+                "mean_score": totals["score"] / count,
+                "mean_coins": totals["coins"] / count,
+                "mean_checkpoints": totals["checkpoints"] / count,
+                "mean_collisions": totals["collisions"] / count,
+                "mean_survived_seconds": totals["survived_seconds"] / count,
+                "survival_rate": totals["finished"] / count
+            })
+        return rows
+
+def parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+def make_tasks(levels, bots, sessions, base_seed, max_ticks, multiplayer, overrides):
+    tasks = []
+    for level_index in levels:
+        level_data = dict(LEVELS[level_index])
+        level_data.update(overrides)
+        for bot in bots:
+            for i in range(sessions):
+                tasks.append((level_data, level_index, bot, base_seed + i, max_ticks, multiplayer))
+    return tasks
+
+def run_batch(tasks, workers=None, output=None, progress=True):
+    # Streams results through an Aggregator (and optionally a JSONL file)
+    # as the pool finishes them
+    workers = workers or os.cpu_count() or 1
+    aggregator = Aggregator()
+    chunksize = max(1, len(tasks) // (workers * 8))
+
+    start = time.perf_counter()
+    file = open(output, 'w') if output else None
+    try:
+        with multiprocessing.Pool(workers) as pool:
+            for result in pool.imap_unordered(run_session, tasks, chunksize=chunksize):
+                aggregator.add(result)
+                if file is not None:
+                    file.write(json.dumps(result) + "\n")
+                if progress and aggregator.sessions % 100 == 0:
+                    elapsed = time.perf_counter() - start
+                    print(f"{aggregator.sessions}/{len(tasks)} sessions "
+                          f"({aggregator.sessions / elapsed:.1f} sessions/sec)")
+    finally:
+        if file is not None:
+            file.close()
+
+    elapsed = time.perf_counter() - start
+    return {
+        "sessions": aggregator.sessions,
+        "workers": workers,
+        "elapsed": elapsed,
+        "sessions_per_sec": aggregator.sessions / elapsed if elapsed > 0 else 0.0,
+        "groups": aggregator.report()
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Run many headless Pixel Runners sessions in parallel")
+    parser.add_argument("--sessions", type=int, default=100, help="sessions per level and bot")
+    parser.add_argument("--levels", type=int, nargs="+", default=list(range(len(LEVELS))), help="indexes into LEVELS")
+    parser.add_argument("--bots", nargs="+", default=["bot"], choices=BOTS)
+    parser.add_argument("--ticks", type=int, default=PHYSICS_TICK_RATE * 60, help="maximum ticks per session")
+    parser.add_argument("--seed", type=int, default=0, help="first session seed")
+    parser.add_argument("--multiplayer", action="store_true")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--set", action="append", default=[], metavar="KEY=VALUE",
+                        help="override a level setting, e.g. platform_density=0.2")
+    parser.add_argument("--output", default=None, help="write every session's result as JSON lines")
+    args = parser.parse_args()
+
+    overrides = {}
+    for item in args.set:
+        key, _, value = item.partition("=")
+        overrides[key] = parse_value(value)
+
+    tasks = make_tasks(args.levels, args.bots, args.sessions, args.seed, args.ticks, args.multiplayer, overrides)
+    summary = run_batch(tasks, args.workers, args.output)
+
+    print(f"{summary['sessions']} sessions on {summary['workers']} workers in {summary['elapsed']:.2f}s "
+          f"({summary['sessions_per_sec']:.1f} sessions/sec)")
+    for row in summary["groups"]:
+        print(f"  {row['level']:12} {row['bot']:7} score {row['mean_score']:7.1f}  coins {row['mean_coins']:5.1f}  "
+              f"checkpoints {row['mean_checkpoints']:4.1f}  collisions {row['mean_collisions']:5.1f}  "
+              f"survived {row['mean_survived_seconds']:5.1f}s  ({row['survival_rate']:.0%} to the time limit)")
+
+if __name__ == "__main__":
+    main()
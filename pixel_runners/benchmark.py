@@ -0,0 +1,281 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import numpy as np
+import pygame
+from settings import *
+import game_clock
+from chunk_generator import Chunk
+from agent_physics import AgentBatch
+from controls import ScriptedControls
+from level import Level
+from player import Player
+from strip_renderer import StripRenderer
+from ui import UI
+from leaderboard import Leaderboard
+from leaderboard_storage import create_storage
+
+# Benchmarks run headless against a simulated clock with every RNG seeded,
+# so two runs on the same machine do the same work. Each benchmark is a
+# setup function (level_data, count, seed) -> (operation, cleanup); the
+# operation is timed `number` times per repeat on a fresh setup, and the
+# median per-operation time over the repeats is reported.
+
+POWERUP_TYPES = ["speed_boost", "high_jump", "slow_motion"]
+
+def populate(level, count, rng):
+    # Splice `count` extra entities into the first screens of the level:
+    # mostly platforms and coins, with some obstacles, checkpoints and
+    # powerups, in the same proportions for every count
+    chunk = Chunk(-1, 0, SCREEN_WIDTH * 3)
+    ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
+    for i in range(count):
+        x = rng.randint(0, chunk.width)
+        y = rng.randint(200, ground_y - 50)
+        kind = i % 10
+        if kind < 4:
+            chunk.platforms.append((x, y, rng.randint(100, 300), rng.randint(20, 40), "normal"))
+        elif kind < 8:
+            chunk.coins.append((x, y - 30))
+        elif kind == 8:
+            chunk.obstacles.append((x, y, rng.randint(30, 60), rng.randint(20, 40), "moving_platform",
+                                    rng.randint(50, 150), rng.uniform(1, 3), rng.choice([True, False])))
+        elif i % 20 == 9:
+            chunk.checkpoints.append((x, ground_y - 80))
+        else:
+            level.spawn_powerup(x, y, rng.choice(POWERUP_TYPES))
+    level.spawn_chunk(chunk)
+
+def make_level(level_data, count, seed, strips=False):
+    level = Level(level_data, seed=seed, threaded=False)
+    if strips:
+        level.strips = StripRenderer(level)
+    populate(level, count, random.Random(seed + count))
+    return level
+
+def make_player(player_id=1):
+    player = Player(100, SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT, player_id)
+    # Run right and jump whenever grounded, so both collision passes do work
+    player.controls = ScriptedControls.from_key_names([[0, ["d", "w"]]])
+    return player
+
+def bench_player_update(level_data, count, seed):
+    level = Level(level_data, seed=seed, threaded=False)
+    rng = random.Random(seed + count)
+    chunk = Chunk(-1, 0, SCREEN_WIDTH * 3)
+    for _ in range(count):
+        chunk.platforms.append((rng.randint(0, chunk.width), rng.randint(200, SCREEN_HEIGHT - GROUND_HEIGHT - 50),
+                                rng.randint(100, 300), rng.randint(20, 40), "normal"))
+    level.spawn_chunk(chunk)
+    player = make_player()
+    return lambda: player.update(level.platforms), level.close
+
+def bench_agent_step(level_data, count, seed):
+    # count is the number of agents, spread over the left half of the
+    # screen and pressing random keys
+    level = make_level(level_data, 200, seed)
+    rng = np.random.default_rng(seed + count)
+    agents = AgentBatch([(rng.integers(0, SCREEN_WIDTH // 2), rng.integers(100, SCREEN_HEIGHT - 200))
+                         for _ in range(count)])
+    keys = rng.random((count, 4)) < 0.3
+
+    def operation():
+        agents.step(level.platforms, keys[:, 0], keys[:, 1], keys[:, 2], keys[:, 3])
+        agents.collide_level(level)
+    return operation, level.close
+
+def bench_level_update(level_data, count, seed):
+    level = make_level(level_data, count, seed)
+    players = [make_player(1), make_player(2)]
+    return lambda: level.update(players), level.close
+
+def bench_generate_segment(level_data, count, seed):
+    level = make_level(level_data, count, seed)
+    return level.generate_level_segment, level.close
+
+def bench_level_draw(level_data, count, seed):
+    level = make_level(level_data, count, seed)
+    screen = pygame.display.get_surface()
+    return lambda: level.draw(screen), level.close
+
+def bench_level_draw_strips(level_data, count, seed):
+    level = make_level(level_data, count, seed, strips=True)
+    screen = pygame.display.get_surface()
+    return lambda: level.draw(screen), level.close
+
+def bench_player_stats(level_data, count, seed):
+    # count is the number of players; scores change every frame so each
+    # panel is re-rendered, which is the expensive case while playing
+    ui = UI()
+    players = [make_player(i % 2 + 1) for i in range(count)]
+    screen = pygame.display.get_surface()
+
+    def operation():
+        for player in players:
+            player.score += 1
+        ui.draw_player_stats(screen, players)
+    return operation, None
+
+def make_leaderboard(level_data, count, seed):
+    # A leaderboard in a scratch directory holding `count` earlier runs
+    directory = tempfile.TemporaryDirectory()
+    storage = create_storage(path=os.path.join(directory.name, "leaderboard"))
+    rng = random.Random(seed + count)
+    storage.append_many([
+        {"player_name": f"Player {rng.randint(1, 2)}", "score": rng.randint(0, 5000),
+         "level": level_data["name"], "date": i}
+        for i in range(count)
+    ])
+    leaderboard = Leaderboard(storage)
+    leaderboard.history_loaded.wait()  # read in the background, not per score
+
+    def cleanup():
+        leaderboard.close()
+        directory.cleanup()
+    return leaderboard, rng, cleanup
+
+def bench_leaderboard_add(level_data, count, seed):
+    leaderboard, rng, cleanup = make_leaderboard(level_data, count, seed)
+    return lambda: leaderboard.add_score("Player 1", rng.randint(0, 5000), level_data["name"]), cleanup
+
+def bench_leaderboard_draw(level_data, count, seed):
+    leaderboard, rng, cleanup = make_leaderboard(level_data, count, seed)
+    screen = pygame.display.get_surface()
+    return lambda: leaderboard.draw(screen), cleanup
+
+# name: (setup, counts, quick counts, operations per repeat, per level)
+BENCHMARKS = {
+    "player_update": (bench_player_update, (10, 100, 1000), (10, 100), 200, True),
+    "agent_step": (bench_agent_step, (10, 100, 500), (10, 100), 100, True),
+    "level_update": (bench_level_update, (50, 200, 1000), (50, 200), 100, True),
+    "generate_segment": (bench_generate_segment, (0, 1000), (0,), 20, True),
+    "level_draw": (bench_level_draw, (50, 200, 1000), (50, 200), 50, True),
+    "level_draw_strips": (bench_level_draw_strips, (50, 200, 1000), (50, 200), 50, True),
+    "player_stats": (bench_player_stats, (1, 2), (1, 2), 200, False),
+    "leaderboard_add": (bench_leaderboard_add, (100, 10000, 100000), (100, 10000), 200, False),
+    "leaderboard_draw": (bench_leaderboard_draw, (100, 10000), (100,), 100, False),
+}
+
+def measure(setup, level_data, count, seed, number, repeats):
+    times = []
+    for repeat in range(repeats):
+        random.seed(seed)
+        game_clock.set_clock(game_clock.SimulatedClock())
+        operation, cleanup = setup(level_data, count, seed)
+        try:
+            start = time.perf_counter()
+            for _ in range(number):
+                operation()
+                game_clock.get_clock().advance()
+            times.append((time.perf_counter() - start) / number)
+        finally:
+            if cleanup is not None:
+                cleanup()
+    return times
+
+def run_benchmarks(seed=0, repeats=5, quick=False, names=None):
+    pygame.init()
+    pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    previous_clock = game_clock.get_clock()
+
+    results = []
+    try:
+        for name, (setup, counts, quick_counts, number, per_level) in BENCHMARKS.items():
+            if names and not any(part in name for part in names):
+                continue
+            levels = LEVELS if per_level else LEVELS[:1]
+            for level_data in levels:
+                for count in (quick_counts if quick else counts):
+                    times = measure(setup, level_data, count, seed, number, repeats)
+                    result = {
+                        "name": name,
+                        "level": level_data["name"] if per_level else None,
+                        "count": count,
+                        "number": number,
+                        "repeats": repeats,
+                        "median_us": statistics.median(times) * 1e6,
+                        "min_us": min(times) * 1e6,
+                    }
+                    results.append(result)
+                    print(f"{result_key(result):40} {result['median_us']:12.1f} us "
+                          f"(min {result['min_us']:.1f})")
+    finally:
+        game_clock.set_clock(previous_clock)
+
+    return {
+        "meta": {
+            "seed": seed,
+            "quick": quick,
+            "python": platform.python_version(),
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+            "date": time.strftime("%Y-%m-%d %H:%M:%S"),
+        },
+        "results": results,
+    }
+
+def result_key(result):
+    return f"{result['name']}/{result['level'] or '-'}/{result['count']}"
+
+def compare(baseline, current, threshold=0.10):
+    # Returns (key, baseline us, current us, ratio) rows and the keys of
+    # those that got slower by more than `threshold`
+    baseline_times = {result_key(result): result["median_us"] for result in baseline["results"]}
+    rows = []
+    regressions = []
+    for result in current["results"]:
+        key = result_key(result)
+        if key not in baseline_times:
+            continue
+        ratio = result["median_us"] / baseline_times[key] if baseline_times[key] else 1.0
+        rows.append((key, baseline_times[key], result["median_us"], ratio))
+        if ratio > 1 + threshold:
+            regressions.append(key)
+    return rows, regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Pixel Runners benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="run the benchmarks and write JSON results")
+    run_parser.add_argument("--output", default="benchmark.json")
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeats", type=int, default=5)
+    run_parser.add_argument("--quick", action="store_true", help="fewer and smaller entity counts")
+    run_parser.add_argument("--only", action="append", default=[], help="run benchmarks whose name contains this")
+
+    compare_parser = subparsers.add_parser("compare", help="flag regressions against a baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown, 0.10 = 10%%")
+
+    args = parser.parse_args()
+    if args.command == "run":
+        report = run_benchmarks(args.seed, args.repeats, args.quick, args.only)
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Wrote {len(report['results'])} results to {args.output}")
+        pygame.quit()
+    else:
+        with open(args.baseline, 'r') as file:
+            baseline = json.load(file)
+        with open(args.current, 'r') as file:
+            current = json.load(file)
+
+        rows, regressions = compare(baseline, current, args.threshold)
+        for key, before, after, ratio in rows:
+            flag = "  REGRESSION" if key in regressions else ""
+            print(f"{key:40} {before:12.1f} -> {after:12.1f} us  {ratio:6.2f}x{flag}")
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+if __name__ == "__main__":
+    main()
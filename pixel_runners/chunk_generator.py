@@ -0,0 +1,113 @@
+import queue
+import random
+import threading
+from settings import *
+
+class Chunk:
+    # Plain-data description of one generated level segment. Level turns it
+    # into sprites when the chunk is spliced in.
+    def __init__(self, index, start_x, width):
+        self.index = index
+        self.start_x = start_x
+        self.width = width
+        self.platforms = []  # (x, y, width, height, platform_type)
+        self.coins = []  # (x, y)
+        self.checkpoints = []  # (x, y)
+        self.obstacles = []  # (x, y, width, height, obstacle_type, move_distance, move_speed, vertical)
+
+    @property
+    def end_x(self):
+        return self.start_x + self.width
+
+def generate_chunk(rng, level_data, index, start_x, width):
+    chunk = Chunk(index, start_x, width)
+    ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
+
+    x = start_x
+    while x < start_x + width:
+        if rng.random() < level_data["platform_density"]:
+            platform_width = rng.randint(100, 300)
+            platform_height = rng.randint(20, 40)
+            platform_y = rng.randint(200, ground_y - 50)
+            chunk.platforms.append((x, platform_y, platform_width, platform_height, "normal"))
+
+            # Add coins on the platform
+            if rng.random() < level_data["coin_density"]:  # Adjust coin density
+                for i in range(rng.randint(3, 6)):  # Add multiple coins
+                    coin_x = x + i * 25 + 10  # Space coins evenly
+                    coin_y = platform_y - 30  # Place coins above the platform
+                    chunk.coins.append((coin_x, coin_y))
+
+            x += platform_width + rng.randint(100, 300)
+        else:
+            x += rng.randint(100, 200)
+
+    # Add checkpoints every 1000 pixels
+    checkpoint_spacing = 1000
+    checkpoint_start = (start_x // checkpoint_spacing + 1) * checkpoint_spacing
+    for x in range(checkpoint_start, start_x + width, checkpoint_spacing):
+        chunk.checkpoints.append((x, ground_y - 80))
+
+    # Add moving obstacles
+    for _ in range(int((width / 1000) * level_data["obstacle_density"] * 5)):
+        obstacle_x = start_x + rng.randint(0, width)
+        obstacle_y = rng.randint(100, ground_y - 100)
+        obstacle_width = rng.randint(30, 60)
+        obstacle_height = rng.randint(20, 40)
+        vertical = rng.choice([True, False])
+        move_distance = rng.randint(50, 150)
+        move_speed = rng.uniform(1, 3)
+        chunk.obstacles.append((obstacle_x, obstacle_y, obstacle_width, obstacle_height,
+                                "moving_platform", move_distance, move_speed, vertical))
+
+    return chunk
+
+class ChunkGenerator:
+    # Generates a level's chunks in order from a per-level seeded RNG, so the
+    # same seed always gives the same level. With threaded set, a worker
+    # thread keeps up to CHUNK_QUEUE_SIZE chunks ready ahead of the camera and
+    # the game loop only takes finished chunks off the queue.
+    def __init__(self, level_data, seed, start_x, first_width=SCREEN_WIDTH * 2,
+                 chunk_width=SCREEN_WIDTH, threaded=True, queue_size=CHUNK_QUEUE_SIZE):
+        self.level_data = level_data
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.next_index = 0
+        self.next_x = start_x
+        self.first_width = first_width
+        self.chunk_width = chunk_width
+
+        self.worker = None
+        if threaded:
+            self.ready = queue.Queue(maxsize=queue_size)
+            self.stopping = threading.Event()
+            self.worker = threading.Thread(target=self.fill_queue, name="chunk-generator", daemon=True)
+            self.worker.start()
+
+    def build_next(self):
+        width = self.first_width if self.next_index == 0 else self.chunk_width
+        chunk = generate_chunk(self.rng, self.level_data, self.next_index, self.next_x, width)
+        self.next_index += 1
+        self.next_x += width
+        return chunk
+
+    def fill_queue(self):
+        while not self.stopping.is_set():
+            chunk = self.build_next()
+            while not self.stopping.is_set():
+                try:
+                    self.ready.put(chunk, timeout=0.1)
+                    break
+                except queue.Full:
+                    pass
+
+    def next_chunk(self):
+        if self.worker is None:
+            return self.build_next()
+        return self.ready.get()
+
+    def close(self):
+        if self.worker is not None:
+            self.stopping.set()
+            self.worker.join()
+            self.worker = None
@@ -0,0 +1,150 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import sys
+import pygame
+from settings import *
+from batch import BOTS, play_session
+from level import sprite_pools
+
+# Runs the same seeded bot sessions with the discrete and the swept
+# collision resolver and reports where they part ways. Each session is
+# stepped by batch.play_session; per tick the players' positions are
+# recorded, along with the platforms each player skipped: ones its move
+# passed over without touching them on either side.
+#
+# Stress options make the players move further per step than the defaults
+# (heavier gravity, stronger jumps), which is where the discrete resolver
+# starts to tunnel. --stress also stacks thin platforms over the start, so
+# a strong jump from the ground crosses one within a single step.
+
+# Thin platforms stacked by --stress, and the jump power used with them:
+# the first step of a jump clears the lowest one and the second passes it
+STRESS_PLATFORM_HEIGHT = 8
+STRESS_PLATFORM_GAP = 150
+STRESS_JUMP_POWER = 120
+
+def skipped_platforms(start, end, platforms):
+    # Players move along x and then along y, so the path is the box swept
+    # by each leg. A platform the path touches that none of the three
+    # corner positions of the move does was passed straight over.
+    corner = pygame.Rect(end.x, start.y, start.width, start.height)
+    legs = (start.union(corner), corner.union(end))
+    count = 0
+    for platform in platforms:
+        rect = platform.rect
+        if (rect.collidelist(legs) != -1 and not start.colliderect(rect)
+                and not corner.colliderect(rect) and not end.colliderect(rect)):
+            count += 1
+    return count
+
+def stack_platforms(level):
+    # Full-width thin platforms above the players' start, from just over
+    # head height up to the top of the screen
+    pool = sprite_pools["platforms"]
+    top = SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT - STRESS_PLATFORM_GAP
+    while top > 0:
+        level.platforms.add(pool.acquire(0, top, SCREEN_WIDTH * 2, STRESS_PLATFORM_HEIGHT, "normal"))
+        top -= STRESS_PLATFORM_GAP
+
+def run_session(level_data, seed, bot, swept, max_ticks, multiplayer=False, gravity=None, jump_power=None,
+                stress=False):
+    def setup(level, players):
+        if stress:
+            stack_platforms(level)
+        for player in players:
+            player.swept = swept
+            if gravity is not None:
+                player.gravity = gravity
+            if jump_power is not None:
+                player.jump_power = jump_power
+
+    positions = []
+    skipped = 0
+
+    def on_tick(level, players):
+        nonlocal skipped
+        for player in players:
+            previous = pygame.Rect(player.previous_position, player.rect.size)
+            skipped += skipped_platforms(previous, player.rect, level.platforms)
+        positions.append(tuple(player.rect.topleft for player in players))
+
+    players, ticks, _, update_time = play_session(level_data, seed, bot, max_ticks, multiplayer, setup, on_tick)
+    return {
+        "ticks": ticks,
+        "skipped": skipped,
+        "player_update_us": update_time / max(ticks, 1) * 1e6,
+        "players": [(player.score, player.coins, player.checkpoints, player.collisions) for player in players],
+        "positions": positions,
+    }
+
+def compare_session(level_data, seed, bot, max_ticks, **options):
+    discrete = run_session(level_data, seed, bot, False, max_ticks, **options)
+    swept = run_session(level_data, seed, bot, True, max_ticks, **options)
+
+    # First tick the players' positions differ, None if they never do
+    diverged = None
+    for tick, (a, b) in enumerate(zip(discrete["positions"], swept["positions"])):
+        if a != b:
+            diverged = tick
+            break
+    if diverged is None and discrete["ticks"] != swept["ticks"]:
+        diverged = min(discrete["ticks"], swept["ticks"])
+
+    return {
+        "level": level_data["name"],
+        "seed": seed,
+        "bot": bot,
+        "diverged_at": diverged,
+        "same_outcome": discrete["players"] == swept["players"] and discrete["ticks"] == swept["ticks"],
+        "discrete": {key: value for key, value in discrete.items() if key != "positions"},
+        "swept": {key: value for key, value in swept.items() if key != "positions"},
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the discrete and swept collision resolvers")
+    parser.add_argument("--levels", type=int, nargs="*", default=list(range(len(LEVELS))))
+    parser.add_argument("--bots", nargs="*", default=["bot", "random"], choices=BOTS)
+    parser.add_argument("--sessions", type=int, default=5, help="seeds per level and bot")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ticks", type=int, default=3600)
+    parser.add_argument("--multiplayer", action="store_true")
+    parser.add_argument("--gravity", type=float, default=None, help="player gravity, to stress fast falls")
+    parser.add_argument("--jump-power", type=float, default=None, help="player jump power, to stress fast jumps")
+    parser.add_argument("--stress", action="store_true",
+                        help=f"stack thin platforms over the start and jump with power {STRESS_JUMP_POWER} "
+                             "unless --jump-power is given, so the discrete resolver tunnels")
+    parser.add_argument("--output", default=None, help="write the per-session results as JSON")
+    args = parser.parse_args()
+    if args.stress and args.jump_power is None:
+        args.jump_power = STRESS_JUMP_POWER
+
+    pygame.init()
+    results = []
+    for level_index in args.levels:
+        for bot in args.bots:
+            for seed in range(args.seed, args.seed + args.sessions):
+                result = compare_session(LEVELS[level_index], seed, bot, args.ticks, multiplayer=args.multiplayer,
+                                         gravity=args.gravity, jump_power=args.jump_power, stress=args.stress)
+                results.append(result)
+                discrete, swept = result["discrete"], result["swept"]
+                print(f"{result['level']:12} {bot:7} seed {seed:3}  "
+                      f"diverged at {str(result['diverged_at']):>5}  "
+                      f"skipped {discrete['skipped']:3} -> {swept['skipped']:3}  "
+                      f"scores {[p[0] for p in discrete['players']]} -> {[p[0] for p in swept['players']]}  "
+                      f"update {discrete['player_update_us']:.1f} -> {swept['player_update_us']:.1f} us")
+
+    same = sum(result["same_outcome"] for result in results)
+    print(f"{same}/{len(results)} sessions with the same outcome; "
+          f"platforms skipped: discrete {sum(r['discrete']['skipped'] for r in results)}, "
+          f"swept {sum(r['swept']['skipped'] for r in results)}")
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    pygame.quit()
+    sys.exit(0 if same == len(results) else 1)
+
+if __name__ == "__main__":
+    main()
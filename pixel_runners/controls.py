@@ -0,0 +1,48 @@
+import pygame
+
+def key_code(name):
+    # "a" -> pygame.K_a, "lshift" -> pygame.K_LSHIFT, "left" -> pygame.K_LEFT
+    code = getattr(pygame, "K_" + name, None)
+    if code is None:
+        code = getattr(pygame, "K_" + name.upper(), None)
+    if code is None:
+        raise ValueError(f"Unknown key name: {name}")
+    return code
+
+class KeyState:
+    # Stands in for the sequence returned by pygame.key.get_pressed()
+    def __init__(self, pressed=()):
+        self.pressed = frozenset(pressed)
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+class ScriptedControls:
+    # Programmatic input for a Player. The script is either a callable
+    # taking the tick number and returning the held key codes, or a list
+    # of (start_tick, keys) entries where each entry is held until the next.
+    def __init__(self, script=None):
+        self.script = script if script is not None else []
+        self.tick = 0
+        self.segment = 0
+        self.current = KeyState()
+
+    @classmethod
+    def from_key_names(cls, entries):
+        return cls([(start, [key_code(name) for name in names]) for start, names in entries])
+
+    def keys_for_tick(self, tick):
+        if callable(self.script):
+            return self.script(tick)
+
+        while self.segment < len(self.script) and self.script[self.segment][0] <= tick:
+            self.current = KeyState(self.script[self.segment][1])
+            self.segment += 1
+        return self.current
+
+    def get_pressed(self):
+        keys = self.keys_for_tick(self.tick)
+        self.tick += 1
+        if not isinstance(keys, KeyState):
+            keys = KeyState(keys)
+        return keys
@@ -0,0 +1,246 @@
+import numpy as np
+import pygame
+from settings import *
+
+# Motion modes understood by the store. Sprites declare theirs in a
+# `motion` attribute; anything else (None) keeps its own update() method.
+SCROLL = 0
+OSCILLATE_VERTICAL = 1
+OSCILLATE_HORIZONTAL = 2
+
+# Below this many entities per-sprite update() calls are cheaper than the
+# fixed cost of the array operations; the store only batches above it
+BATCH_MIN_ENTITIES = 32
+
+def round_like_rect(values):
+    # pygame.Rect rounds float coordinates half away from zero
+    return np.where(values >= 0, np.floor(values + 0.5), np.ceil(values - 0.5))
+
+class KinematicStore:
+    # Struct-of-arrays copy of every batched entity's motion state. A whole
+    # group advances with a handful of array operations per frame; the
+    # pygame Rects are only written for entities that are on screen, and
+    # for horizontal oscillators, which can swing back onto it.
+    #
+    # Small groups are cheaper to update sprite by sprite, so the store only
+    # takes over while batched is set; the arrays are reloaded from the
+    # sprites when batching starts and written back when it stops.
+    def __init__(self, capacity=64):
+        self.count = 0
+        self.live = 0
+        self.batched = False
+        # Counters that let step() skip work the group does not need
+        self.oscillating = 0
+        self.fractional_speeds = 0
+        self.sprites = []
+        self.slots = {}
+        self.allocate(capacity)
+
+    def allocate(self, capacity):
+        def grow(old, dtype):
+            new = np.zeros(capacity, dtype=dtype)
+            if old is not None:
+                new[:self.count] = old[:self.count]
+            return new
+
+        self.x = grow(getattr(self, "x", None), np.float64)
+        self.y = grow(getattr(self, "y", None), np.float64)
+        self.width = grow(getattr(self, "width", None), np.float64)
+        self.speed = grow(getattr(self, "speed", None), np.float64)
+        self.mode = grow(getattr(self, "mode", None), np.int8)
+        self.start_x = grow(getattr(self, "start_x", None), np.float64)
+        self.start_y = grow(getattr(self, "start_y", None), np.float64)
+        self.progress = grow(getattr(self, "progress", None), np.float64)
+        self.direction = grow(getattr(self, "direction", None), np.float64)
+        self.move_speed = grow(getattr(self, "move_speed", None), np.float64)
+        self.move_distance = grow(getattr(self, "move_distance", None), np.float64)
+        self.alive = grow(getattr(self, "alive", None), np.bool_)
+        self.capacity = capacity
+
+    def add(self, sprite):
+        if self.count == self.capacity:
+            self.allocate(self.capacity * 2)
+
+        i = self.count
+        self.count += 1
+        self.live += 1
+        self.sprites.append(sprite)
+        self.slots[sprite] = i
+
+        self.x[i] = sprite.rect.x
+        self.y[i] = sprite.rect.y
+        self.width[i] = sprite.rect.width
+        self.speed[i] = sprite.speed
+        self.alive[i] = True
+        if sprite.speed != int(sprite.speed):
+            self.fractional_speeds += 1
+
+        if sprite.motion == "oscillate":
+            self.oscillating += 1
+            self.mode[i] = OSCILLATE_VERTICAL if sprite.vertical else OSCILLATE_HORIZONTAL
+            self.start_x[i] = sprite.start_pos.x
+            self.start_y[i] = sprite.start_pos.y
+            self.progress[i] = sprite.progress
+            self.direction[i] = sprite.direction
+            self.move_speed[i] = sprite.move_speed
+            self.move_distance[i] = sprite.move_distance
+        else:
+            self.mode[i] = SCROLL
+
+    def start_batching(self):
+        for sprite, i in self.slots.items():
+            self.x[i] = sprite.rect.x
+            self.y[i] = sprite.rect.y
+            if self.mode[i] != SCROLL:
+                self.progress[i] = sprite.progress
+                self.direction[i] = sprite.direction
+        self.batched = True
+
+    def stop_batching(self):
+        for sprite in self.slots:
+            self.sync(sprite)
+        self.batched = False
+
+    def remove(self, sprite):
+        i = self.slots.pop(sprite)
+        if self.mode[i] != SCROLL:
+            self.oscillating -= 1
+        if self.speed[i] != int(self.speed[i]):
+            self.fractional_speeds -= 1
+        self.alive[i] = False
+        self.sprites[i] = None
+        self.live -= 1
+
+        # Compact once most slots are dead so the arrays stay dense
+        if self.count > 64 and self.live < self.count // 2:
+            self.compact()
+
+    def compact(self):
+        keep = np.flatnonzero(self.alive[:self.count])
+        for name in ("x", "y", "width", "speed", "mode", "start_x", "start_y",
+                     "progress", "direction", "move_speed", "move_distance", "alive"):
+            array = getattr(self, name)
+            array[:len(keep)] = array[keep]
+        self.sprites = [self.sprites[i] for i in keep]
+        self.slots = {sprite: i for i, sprite in enumerate(self.sprites)}
+        self.count = len(keep)
+
+    def step(self):
+        # Advance every entity one frame; returns the sprites that scrolled off
+        # the left edge. Mirrors Coin/Platform/Obstacle/MovingObstacle.update.
+        n = self.count
+        if self.live == 0:
+            return []
+
+        alive = self.alive[:n]
+        x = self.x[:n]
+        mode = self.mode[:n]
+
+        # Whole-pixel speeds keep x integral, so rounding is only needed otherwise
+        if self.fractional_speeds:
+            x[:] = round_like_rect(x - self.speed[:n])
+        else:
+            x -= self.speed[:n]
+
+        if self.oscillating:
+            oscillating = mode != SCROLL
+            progress = self.progress[:n]
+            direction = self.direction[:n]
+            distance = self.move_distance[:n]
+
+            progress[oscillating] += self.move_speed[:n][oscillating] * direction[oscillating]
+            turned = oscillating & (np.abs(progress) > distance)
+            direction[turned] *= -1
+            progress[turned] = distance[turned] * direction[turned]
+
+            vertical = mode == OSCILLATE_VERTICAL
+            self.y[:n][vertical] = round_like_rect(self.start_y[:n][vertical] + progress[vertical])
+
+            horizontal = mode == OSCILLATE_HORIZONTAL
+            x[horizontal] = round_like_rect(self.start_x[:n][horizontal] - self.speed[:n][horizontal]
+                                            + progress[horizontal])
+
+        # Cull through a mask, then write back only what is visible.
+        # Horizontal oscillators are always written: they move back right,
+        # so a rect last written on screen would otherwise stay there.
+        right = x + self.width[:n]
+        culled = alive & (right < 0)
+        visible = alive & (right >= 0) & (x < SCREEN_WIDTH)
+        if self.oscillating:
+            visible |= alive & (right >= 0) & (mode == OSCILLATE_HORIZONTAL)
+
+        sprites = self.sprites
+        shown = np.nonzero(visible)[0]
+        for i, value in zip(shown.tolist(), x[shown].tolist()):
+            sprites[i].rect.x = value
+        if self.oscillating:
+            shown = np.nonzero(visible & (mode == OSCILLATE_VERTICAL))[0]
+            for i, value in zip(shown.tolist(), self.y[shown].tolist()):
+                sprites[i].rect.y = value
+
+        if not culled.any():
+            return []
+        return [sprites[i] for i in np.nonzero(culled)[0].tolist()]
+
+    def sync(self, sprite):
+        # Bring one sprite's Rect and motion attributes up to date, e.g.
+        # before code that is not store-aware reads them
+        i = self.slots[sprite]
+        sprite.rect.x = self.x[i]
+        if self.mode[i] == OSCILLATE_VERTICAL:
+            sprite.rect.y = self.y[i]
+        if self.mode[i] != SCROLL:
+            sprite.progress = float(self.progress[i])
+            sprite.direction = int(self.direction[i])
+
+class EntityGroup(pygame.sprite.Group):
+    # Sprite group whose members advance through a shared KinematicStore.
+    # Sprites with motion None keep running their own update() method.
+    # With a pool set, sprites that leave the group are handed back to it;
+    # with an index set, members are kept in it under the group's kind.
+    def __init__(self, *sprites, pool=None, index=None, kind=None):
+        self.store = KinematicStore()
+        self.custom = {}
+        self.pool = pool
+        self.index = index
+        self.kind = kind
+        super().__init__(*sprites)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        if getattr(sprite, "motion", None) is None:
+            self.custom[sprite] = None
+        else:
+            self.store.add(sprite)
+        if self.index is not None:
+            self.index.add(sprite, self.kind)
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        if sprite in self.custom:
+            del self.custom[sprite]
+        else:
+            self.store.remove(sprite)
+        if self.index is not None:
+            self.index.remove(sprite)
+        # Sprites composited into a static strip are erased from it
+        if getattr(sprite, "strip", None) is not None:
+            sprite.strip.erase(sprite)
+        if self.pool is not None:
+            self.pool.release(sprite)
+
+    def update(self, *args, **kwargs):
+        store = self.store
+        if store.batched and store.live < BATCH_MIN_ENTITIES // 2:
+            store.stop_batching()
+        elif not store.batched and store.live >= BATCH_MIN_ENTITIES:
+            store.start_batching()
+        
+        if store.batched:
+            for sprite in store.step():
+                sprite.kill()
+        else:
+            for sprite in list(store.slots):
+                sprite.update(*args, **kwargs)
+        for sprite in list(self.custom):
+            sprite.update(*args, **kwargs)
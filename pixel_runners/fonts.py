@@ -0,0 +1,16 @@
+import pygame
+from settings import *
+
+# Fonts by (name, size, bold). pygame.font.SysFont looks the name up in the
+# system font list on every call, so each font is resolved once, on first
+# use, and shared by everything that draws text.
+fonts = {}
+
+def get_font(size, bold=False, name='Arial'):
+    key = (name, size, bold)
+    font = fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = fonts[key] = pygame.font.SysFont(name, size, bold=bold)
+    return font
@@ -1,21 +1,38 @@
 import pygame
 import sys
-import numpy as np
+import time
 from settings import *
-from player import Player
-from level import Level
 from ui import UI
 from leaderboard import Leaderboard
+from renderer import DirtyRenderer
+from profiler import frame_profiler
+from replay import RecordingControls, save_replay
+import game_clock
 import os
-import random
 
 class Game:
-    def __init__(self):
-        # Initialize pygame
-        pygame.init()
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption(TITLE)
+    def __init__(self, headless=False):
+        # Seconds spent in each startup phase, for the --startup-report option
+        self.startup_times = {}
+        self.startup_report = False
+        phase_start = time.perf_counter()
+        
+        # Initialize pygame. Only the display and the timer are started here:
+        # the game has no sound, and fonts are initialized by the font
+        # registry on first use.
+        pygame.display.init()
+        self.headless = headless
+        if headless:
+            # No window: the world is stepped and never drawn (see headless.py)
+            self.screen = None
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption(TITLE)
         self.clock = pygame.time.Clock()
+        # The first tick starts SDL's timer, without which
+        # pygame.time.get_ticks (and so the real game clock) stays at 0
+        self.clock.tick()
+        phase_start = self.record_startup("display", phase_start)
         
         # Game state
         self.running = True
@@ -23,51 +40,62 @@ class Game:
         self.selected_option = 0
         self.selected_level = 0
         self.multiplayer = False
+        self.level_seed = None  # None picks a new random level each game
+        self.record_replays = RECORD_REPLAYS and not headless
+        self.recorders = []
+        self.replay_start_ticks = 0
         
         # Game objects
         self.ui = UI()
-        self.leaderboard = Leaderboard()
+        self.leaderboard = None if headless else Leaderboard()
+        phase_start = self.record_startup("leaderboard", phase_start)
         self.players = []
+        self.run_ranks = []
         self.level = None
         
         # Menu options
         self.menu_options = ["Start Game", "Multiplayer", "Leaderboard", "Quit"]
         
-        # Load assets
-        self.load_assets()
-        self.load_ui_assets()  # Call this method to load UI assets
-    
-    def load_assets(self):
-        # Create directory structure if it doesn't exist
-        os.makedirs("assets/images/backgrounds", exist_ok=True)
-        os.makedirs("assets/images/characters", exist_ok=True)
-        os.makedirs("assets/images/platforms", exist_ok=True)
-        os.makedirs("assets/images/powerups", exist_ok=True)
-        os.makedirs("assets/images/ui", exist_ok=True)
-        os.makedirs("assets/sounds", exist_ok=True)
-        
-        # Create a simple background
-        self.background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.background.fill((100, 150, 255))  # Sky blue
-        
-        # Draw some simple clouds
-        for _ in range(10):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT // 2)
-            radius = random.randint(20, 50)
-            pygame.draw.circle(self.background, WHITE, (x, y), radius)
+        # Optional dirty-rect presentation (see renderer.py)
+        self.renderer = None
+        if DIRTY_RECT_RENDERING and not headless:
+            self.renderer = DirtyRenderer(self.screen)
+        
+        # Load assets. Only what the menu shows is loaded up front; level,
+        # player and font work happens when a game or screen first needs it.
+        if not headless:
+            self.load_ui_assets()  # Call this method to load UI assets
+        self.record_startup("assets", phase_start)
+    
+    def record_startup(self, phase, phase_start):
+        now = time.perf_counter()
+        self.startup_times[phase] = now - phase_start
+        return now
+    
+    def print_startup_report(self):
+        total = sum(self.startup_times.values())
+        print(f"Startup: {total * 1000:.1f} ms to the first menu frame")
+        for phase, seconds in self.startup_times.items():
+            print(f"  {phase:<12} {seconds * 1000:8.1f} ms")
     
     def load_ui_assets(self):
-        self.start_button = pygame.image.load(os.path.join("assets", "images", "ui", "start_button.png")).convert_alpha()
-        self.quit_button = pygame.image.load(os.path.join("assets", "images", "ui", "quit_button.png")).convert_alpha()
-        self.menu_background = pygame.image.load(os.path.join("assets", "images", "ui", "menu_background.png")).convert_alpha()
-        self.game_over_screen = pygame.image.load(os.path.join("assets", "images", "ui", "game_over.png")).convert_alpha()
+        # Paths are relative to the package, not the working directory
+        ui_dir = os.path.join(IMAGE_DIR, "ui")
+        self.start_button = pygame.image.load(os.path.join(ui_dir, "start_button.png")).convert_alpha()
+        self.quit_button = pygame.image.load(os.path.join(ui_dir, "quit_button.png")).convert_alpha()
+        self.menu_background = pygame.image.load(os.path.join(ui_dir, "menu_background.png")).convert_alpha()
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             
+            # Profiler hotkeys work in every state
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                frame_profiler.toggle()
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                frame_profiler.export()
+            
             if self.game_state == "menu":
                 self.handle_menu_events(event)
             elif self.game_state == "level_select":
@@ -101,7 +129,7 @@ class Game:
     def handle_playing_events(self, event):
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
-                self.game_state = "game_over"
+                self.end_game()
     
     def handle_game_over_events(self, event):
         if event.type == pygame.KEYDOWN:
@@ -124,13 +152,20 @@ class Game:
             self.multiplayer = True
             self.game_state = "level_select"
         elif self.menu_options[self.selected_option] == "Leaderboard":
+            self.leaderboard.load_scores()
             self.game_state = "leaderboard"
         elif self.menu_options[self.selected_option] == "Quit":
             self.running = False
     
     def start_game(self):
+        # Imported on first use: the menu never needs the level modules
+        from level import Level
+        from player import Player
+        
         # Create level
-        self.level = Level(LEVELS[self.selected_level])
+        if self.level is not None:
+            self.level.close()
+        self.level = Level(LEVELS[self.selected_level], seed=self.level_seed)
         
         # Create players
         self.players = []
@@ -141,6 +176,14 @@ class Game:
             player2 = Player(200, SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT, 2)
             self.players.append(player2)
         
+        # Record each player's input for replay.py
+        self.recorders = []
+        if self.record_replays:
+            self.replay_start_ticks = getattr(game_clock.get_clock(), "ticks", 0)
+            for player in self.players:
+                player.controls = RecordingControls(player.player_id)
+                self.recorders.append(player.controls)
+        
         self.game_state = "playing"
     
     def update(self):
@@ -148,9 +191,11 @@ class Game:
             # Update players
             for player in self.players:
                 player.update(self.level.platforms)
+            frame_profiler.mark("players")
             
             # Update level
             self.level.update(self.players)
+            frame_profiler.mark("level")
             
             # Check if game is over (all players reached the end or fell off)
             game_over = True
@@ -159,24 +204,66 @@ class Game:
                     game_over = False
             
             if game_over:
-                self.game_state = "game_over"
+                self.end_game()
+        elif self.game_state == "game_over":
+            self.update_run_ranks()
+    
+    def end_game(self):
+        self.game_state = "game_over"
+        self.run_ranks = []
+        self.update_run_ranks()
+        
+        if self.recorders:
+            save_replay(self, self.recorders, self.replay_start_ticks)
+            self.recorders = []
+    
+    def update_run_ranks(self):
+        # Where each run would place, looked up once from the score index.
+        # The index is read in the background at startup; until it is ready
+        # the game-over screen shows no ranks rather than waiting for it.
+        if self.run_ranks or self.leaderboard is None or not self.leaderboard.history_ready():
+            return
+        self.run_ranks = [self.leaderboard.run_ranks(player.score, self.level.name) for player in self.players]
+    
+    def time_scale(self):
+        # Slow motion slows the whole world down, not just one player
+        if self.game_state == "playing":
+            for player in self.players:
+                if "slow_motion" in player.active_powerups:
+                    return SLOW_MOTION_FACTOR
+        return 1.0
     
-    def draw(self):
-        self.screen.fill(BLACK)
+    def draw(self, interpolation=1.0):
+        # The dirty-rect path always draws the latest physics state. It does
+        # not know about the profiler overlay, so full frames are drawn while
+        # the profiler is on.
+        if self.renderer is not None and not frame_profiler.enabled:
+            self.renderer.present(self)
+            return
+        
+        self.draw_frame(interpolation)
+        frame_profiler.mark("draw_hud")
+        frame_profiler.draw(self.screen)
+        frame_profiler.mark("overlay")
+        pygame.display.flip()
+        frame_profiler.mark("flip")
+    
+    def draw_frame(self, interpolation=1.0):
+        # The level background is opaque and covers the whole screen
+        if self.game_state not in ("playing", "game_over"):
+            self.screen.fill(BLACK)
         
         if self.game_state == "menu":
             self.draw_menu()
         elif self.game_state == "level_select":
             self.draw_level_select()
         elif self.game_state == "playing":
-            self.draw_game()
+            self.draw_game(interpolation)
         elif self.game_state == "game_over":
             self.draw_game()
-            self.ui.draw_game_over(self.screen, self.players)
+            self.ui.draw_game_over(self.screen, self.players, self.run_ranks)
         elif self.game_state == "leaderboard":
             self.leaderboard.draw(self.screen)
-        
-        pygame.display.flip()
     
     def draw_menu(self):
         self.screen.blit(self.menu_background, (0, 0))  # Draw the menu background
@@ -190,23 +277,55 @@ class Game:
         # Draw level options
         self.ui.draw_level_select(self.screen, LEVELS, self.selected_level)
     
-    def draw_game(self):
+    def draw_game(self, interpolation=1.0):
         # Draw level
-        self.level.draw(self.screen)
+        self.level.draw(self.screen, interpolation)
+        frame_profiler.mark("draw_level")
         
-        # Draw players
+        # Draw players between their previous and current physics positions
         for player in self.players:
-            self.screen.blit(player.image, player.rect)
+            self.screen.blit(player.image, player.interpolated_position(interpolation))
         
         # Draw UI
         self.ui.draw_player_stats(self.screen, self.players)
     
     def run(self):
+        # Physics runs in fixed steps of game time, independent of the render
+        # rate. Timers (dash, power-ups, blinking platforms) follow the same
+        # simulated clock, so slow motion and frame drops affect them equally.
+        tick_seconds = 1 / PHYSICS_TICK_RATE
+        sim_clock = game_clock.SimulatedClock(1000 * tick_seconds)
+        game_clock.set_clock(sim_clock)
+        accumulator = 0.0
+        first_frame_start = time.perf_counter()
+        
         while self.running:
+            frame_seconds = self.clock.tick(RENDER_FPS) / 1000
+            frame_profiler.begin_frame()
             self.handle_events()
-            self.update()
-            self.draw()
-            self.clock.tick(FPS)
+            frame_profiler.mark("events")
+            
+            accumulator += frame_seconds * self.time_scale()
+            steps = 0
+            while accumulator >= tick_seconds and steps < MAX_CATCHUP_STEPS:
+                self.update()
+                sim_clock.advance()
+                accumulator -= tick_seconds
+                steps += 1
+            
+            # Too far behind: drop the backlog rather than spiral
+            if accumulator >= tick_seconds:
+                accumulator = 0.0
+            
+            self.draw(accumulator / tick_seconds)
+            frame_profiler.end_frame(self.level if self.game_state == "playing" else None)
+            
+            if first_frame_start is not None:
+                self.record_startup("first_frame", first_frame_start)
+                first_frame_start = None
+                if self.startup_report:
+                    self.print_startup_report()
         
+        self.leaderboard.close()
         pygame.quit()
         sys.exit() 
\ No newline at end of file
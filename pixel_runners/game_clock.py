@@ -0,0 +1,36 @@
+import pygame
+from settings import *
+
+class RealClock:
+    # Wall-clock time, used by the interactive game
+    def get_ticks(self):
+        return pygame.time.get_ticks()
+
+class SimulatedClock:
+    # Tick-driven time for headless runs: every step advances a fixed amount
+    # of game time no matter how fast the host machine is
+    def __init__(self, tick_ms=1000 / PHYSICS_TICK_RATE):
+        self.tick_ms = tick_ms
+        self.ticks = 0
+
+    def advance(self, steps=1):
+        self.ticks += steps
+
+    def get_ticks(self):
+        return int(self.ticks * self.tick_ms)
+
+# Clock used by everything that needs game time (dash, power-ups, blinking platforms)
+_active_clock = RealClock()
+
+def get_ticks():
+    return _active_clock.get_ticks()
+
+def get_clock():
+    return _active_clock
+
+def set_clock(clock):
+    # Returns the previous clock so callers can restore it
+    global _active_clock
+    previous = _active_clock
+    _active_clock = clock
+    return previous
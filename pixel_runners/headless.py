@@ -0,0 +1,96 @@
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import json
+import random
+import time
+import pygame
+from settings import *
+import game_clock
+from controls import ScriptedControls
+from replay import player_results
+from game import Game
+
+class HeadlessRunner:
+    # Steps Game.update() against a simulated clock with no window and no drawing
+    def __init__(self, level_index=0, multiplayer=False, controls=None, seed=None, clock=None):
+        if seed is not None:
+            random.seed(seed)
+
+        self.clock = clock or game_clock.SimulatedClock()
+        self.previous_clock = game_clock.set_clock(self.clock)
+
+        self.game = Game(headless=True)
+        self.game.selected_level = level_index
+        self.game.multiplayer = multiplayer
+        self.game.level_seed = seed
+        self.game.start_game()
+
+        # One controls object per player; players without one stand still
+        controls = controls or []
+        for i, player in enumerate(self.game.players):
+            player.controls = controls[i] if i < len(controls) else ScriptedControls()
+
+    @property
+    def players(self):
+        return self.game.players
+
+    @property
+    def level(self):
+        return self.game.level
+
+    def step(self):
+        self.game.update()
+        self.clock.advance()
+
+    def run(self, max_ticks):
+        start = time.perf_counter()
+        ticks = 0
+        while ticks < max_ticks and self.game.game_state == "playing":
+            self.step()
+            ticks += 1
+        elapsed = time.perf_counter() - start
+
+        return {
+            "ticks": ticks,
+            "elapsed": elapsed,
+            "ticks_per_sec": ticks / elapsed if elapsed > 0 else 0.0,
+            "game_over": self.game.game_state != "playing",
+            "players": player_results(self.players)
+        }
+
+    def close(self):
+        self.level.close()
+        game_clock.set_clock(self.previous_clock)
+
+def load_script(path):
+    # Script file: JSON list of [start_tick, ["d", "w", ...]] entries
+    with open(path, 'r') as file:
+        return ScriptedControls.from_key_names(json.load(file))
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Pixel Runners without a display")
+    parser.add_argument("--level", type=int, default=0, help="index into LEVELS")
+    parser.add_argument("--ticks", type=int, default=10000, help="maximum ticks to simulate")
+    parser.add_argument("--multiplayer", action="store_true")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--script", action="append", default=[],
+                        help="input script for a player (repeat for player 2)")
+    args = parser.parse_args()
+
+    controls = [load_script(path) for path in args.script]
+    runner = HeadlessRunner(args.level, args.multiplayer, controls, args.seed)
+    result = runner.run(args.ticks)
+    runner.close()
+
+    print(f"{LEVELS[args.level]['name']}: {result['ticks']} ticks in {result['elapsed']:.3f}s "
+          f"({result['ticks_per_sec']:.0f} ticks/sec)")
+    for player in result["players"]:
+        print(f"  Player {player['player_id']}: score {player['score']}, "
+              f"coins {player['coins']}, checkpoints {player['checkpoints']}")
+
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
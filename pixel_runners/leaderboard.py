@@ -1,33 +1,88 @@
 import pygame
 import json
 import os
+import threading
+import time
 from settings import *
+from text_cache import render_text
+from fonts import get_font
+from leaderboard_storage import create_storage, BackgroundWriter
+from score_index import ScoreHistory
 
 class Leaderboard:
-    def __init__(self):
+    def __init__(self, storage=None):
         self.scores = []
-        self.font = pygame.font.SysFont('Arial', 24)
-        self.title_font = pygame.font.SysFont('Arial', 48, bold=True)
-        self.file_path = "leaderboard.json"
+        self.file_path = "leaderboard.json"  # pre-storage format, imported once
+        
+        # Every recorded run, read in the background. Runs added before the
+        # read finishes wait in pending_runs and join the index after it.
+        self.score_history = None
+        self.pending_runs = []
+        self.history_lock = threading.Lock()
+        self.history_loaded = threading.Event()
+        
+        # Scores are committed by a background writer so the game loop never
+        # waits on disk. The history is read on the writer's thread before
+        # its first write, so no queued run is both read back and pending.
+        self.storage = storage or create_storage()
+        self.migrate_legacy_scores()
+        self.writer = BackgroundWriter(self.storage, first=self.load_history)
         self.load_scores()
     
-    def load_scores(self):
+    @property
+    def font(self):
+        return get_font(24)
+    
+    @property
+    def title_font(self):
+        return get_font(48, bold=True)
+    
+    @property
+    def history(self):
+        # Waits for the background read; the game checks history_ready() first
+        self.history_loaded.wait()
+        return self.score_history
+    
+    def history_ready(self):
+        return self.history_loaded.is_set()
+    
+    def migrate_legacy_scores(self):
         try:
-            if os.path.exists(self.file_path):
+            if os.path.exists(self.file_path) and self.storage.is_empty():
                 with open(self.file_path, 'r') as file:
-                    self.scores = json.load(file)
-                    # Sort scores in descending order
-                    self.scores.sort(key=lambda x: x["score"], reverse=True)
+                    self.storage.append_many(json.load(file))
         except Exception as e:
-            print(f"Error loading leaderboard: {e}")
-            self.scores = []
+            print(f"Error importing {self.file_path}: {e}")
     
-    def save_scores(self):
+    def load_history(self):
+        # The full history is read once; runs added later go straight into the index
+        history = ScoreHistory()
         try:
-            with open(self.file_path, 'w') as file:
-                json.dump(self.scores, file)
+            history = ScoreHistory(self.storage.load_all())
         except Exception as e:
-            print(f"Error saving leaderboard: {e}")
+            print(f"Error loading score history: {e}")
+        
+        with self.history_lock:
+            for run in self.pending_runs:
+                history.add(run)
+            self.pending_runs = []
+            self.score_history = history
+        self.history_loaded.set()
+    
+    def load_scores(self):
+        # Re-read the top scores, including ones other game processes added
+        try:
+            self.scores = self.storage.top_scores(10)
+        except Exception as e:
+            print(f"Error loading leaderboard: {e}")
+    
+    def save_scores(self):
+        # Wait for queued scores to be committed
+        self.writer.flush()
+    
+    def close(self):
+        self.writer.close()
+        self.storage.close()
     
     def add_score(self, player_name, score, level_name):
         # Add new score
@@ -35,17 +90,40 @@ class Leaderboard:
             "player_name": player_name,
             "score": score,
             "level": level_name,
-            "date": pygame.time.get_ticks()  # Simple timestamp
+            "date": int(time.time())  # Unix timestamp
         }
         
         self.scores.append(new_score)
+        with self.history_lock:
+            if self.score_history is None:
+                self.pending_runs.append(new_score)
+            else:
+                self.score_history.add(new_score)
         
         # Keep only top 10 scores
         self.scores.sort(key=lambda x: x["score"], reverse=True)
         self.scores = self.scores[:10]
         
-        # Save updated scores
-        self.save_scores()
+        # Queue the write; the background writer commits it
+        self.writer.submit(new_score)
+    
+    def rank(self, score, level_name=None):
+        # Place a run with this score would take, overall or on one level
+        return self.history.rank(score, level_name)
+    
+    def percentile(self, score, level_name=None):
+        return self.history.percentile(score, level_name)
+    
+    def top_scores(self, count=10, level_name=None, player_name=None):
+        return self.history.top(count, level_name, player_name)
+    
+    def run_ranks(self, score, level_name):
+        return {
+            "rank": self.rank(score),
+            "level_rank": self.rank(score, level_name),
+            "percentile": self.percentile(score),
+            "total": len(self.history)
+        }
     
     def draw(self, screen):
         # Background
@@ -53,22 +131,22 @@ class Leaderboard:
         pygame.draw.rect(screen, WHITE, (SCREEN_WIDTH//4, 100, SCREEN_WIDTH//2, SCREEN_HEIGHT - 200), width=2, border_radius=10)
         
         # Title
-        title_surf = self.title_font.render("LEADERBOARD", True, WHITE)
+        title_surf = render_text(self.title_font, "LEADERBOARD", WHITE)
         title_rect = title_surf.get_rect(center=(SCREEN_WIDTH//2, 150))
         screen.blit(title_surf, title_rect)
         
         # Headers
         header_y = 200
-        rank_header = self.font.render("Rank", True, YELLOW)
+        rank_header = render_text(self.font, "Rank", YELLOW)
         screen.blit(rank_header, (SCREEN_WIDTH//4 + 30, header_y))
         
-        name_header = self.font.render("Player", True, YELLOW)
+        name_header = render_text(self.font, "Player", YELLOW)
         screen.blit(name_header, (SCREEN_WIDTH//4 + 100, header_y))
         
-        score_header = self.font.render("Score", True, YELLOW)
+        score_header = render_text(self.font, "Score", YELLOW)
         screen.blit(score_header, (SCREEN_WIDTH//4 + 250, header_y))
         
-        level_header = self.font.render("Level", True, YELLOW)
+        level_header = render_text(self.font, "Level", YELLOW)
         screen.blit(level_header, (SCREEN_WIDTH//4 + 350, header_y))
         
         # Draw line under headers
@@ -78,7 +156,7 @@ class Leaderboard:
         
         # Scores
         if not self.scores:
-            no_scores = self.font.render("No scores yet!", True, WHITE)
+            no_scores = render_text(self.font, "No scores yet!", WHITE)
             no_scores_rect = no_scores.get_rect(center=(SCREEN_WIDTH//2, 300))
             screen.blit(no_scores, no_scores_rect)
         else:
@@ -87,22 +165,22 @@ class Leaderboard:
                 
                 # Rank
                 rank_text = f"{i+1}."
-                rank_surf = self.font.render(rank_text, True, WHITE)
+                rank_surf = render_text(self.font, rank_text, WHITE)
                 screen.blit(rank_surf, (SCREEN_WIDTH//4 + 30, y_pos))
                 
                 # Player name
-                name_surf = self.font.render(score_data["player_name"], True, WHITE)
+                name_surf = render_text(self.font, score_data["player_name"], WHITE)
                 screen.blit(name_surf, (SCREEN_WIDTH//4 + 100, y_pos))
                 
                 # Score
-                score_surf = self.font.render(str(score_data["score"]), True, WHITE)
+                score_surf = render_text(self.font, str(score_data["score"]), WHITE)
                 screen.blit(score_surf, (SCREEN_WIDTH//4 + 250, y_pos))
                 
                 # Level
-                level_surf = self.font.render(score_data["level"], True, WHITE)
+                level_surf = render_text(self.font, score_data["level"], WHITE)
                 screen.blit(level_surf, (SCREEN_WIDTH//4 + 350, y_pos))
         
         # Back instruction
-        back_text = self.font.render("Press ESC to return to menu", True, WHITE)
+        back_text = render_text(self.font, "Press ESC to return to menu", WHITE)
         back_rect = back_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 120))
         screen.blit(back_text, back_rect) 
\ No newline at end of file
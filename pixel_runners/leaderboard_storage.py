@@ -0,0 +1,168 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+from settings import *
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are still atomic per write, just not locked
+    fcntl = None
+
+FIELDS = ("player_name", "score", "level", "date")
+
+class SQLiteStorage:
+    # Scores in an SQLite database in WAL mode. Readers never block the
+    # writer, each batch is one transaction, and several game processes can
+    # share the file (busy_timeout makes a second writer wait its turn).
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        with self.connection() as connection:
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "id INTEGER PRIMARY KEY, player_name TEXT NOT NULL, score INTEGER NOT NULL, "
+                "level TEXT NOT NULL, date INTEGER NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC)")
+
+    def connection(self):
+        # sqlite3 connections belong to the thread that made them
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def is_empty(self):
+        return self.connection().execute("SELECT 1 FROM scores LIMIT 1").fetchone() is None
+
+    def append_many(self, records):
+        with self.connection() as connection:
+            connection.executemany(
+                "INSERT INTO scores (player_name, score, level, date) VALUES (?, ?, ?, ?)",
+                [tuple(record[field] for field in FIELDS) for record in records]
+            )
+
+    def top_scores(self, limit):
+        rows = self.connection().execute(
+            "SELECT player_name, score, level, date FROM scores ORDER BY score DESC, id LIMIT ?", (limit,)
+        ).fetchall()
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+    def load_all(self):
+        rows = self.connection().execute("SELECT player_name, score, level, date FROM scores ORDER BY id")
+        return [dict(zip(FIELDS, row)) for row in rows]
+
+    def close(self):
+        connection = getattr(self.local, "connection", None)
+        if connection is not None:
+            connection.close()
+            self.local.connection = None
+
+class JSONLStorage:
+    # Append-only file with one JSON score per line. A batch is written with
+    # a single append under an exclusive lock and fsynced, so a crash can at
+    # most leave a torn last line, which loading skips.
+    def __init__(self, path):
+        self.path = path
+
+    def is_empty(self):
+        return not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+
+    def append_many(self, records):
+        data = "".join(json.dumps({field: record[field] for field in FIELDS}) + "\n" for record in records)
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+            os.write(fd, data.encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def load_all(self):
+        records = []
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    print(f"Skipping damaged leaderboard line in {self.path}")
+        return records
+
+    def top_scores(self, limit):
+        records = self.load_all()
+        records.sort(key=lambda x: x["score"], reverse=True)
+        return records[:limit]
+
+    def close(self):
+        pass
+
+def create_storage(backend=LEADERBOARD_BACKEND, path=LEADERBOARD_PATH):
+    if backend == "sqlite":
+        return SQLiteStorage(path + ".db")
+    if backend == "jsonl":
+        return JSONLStorage(path + ".jsonl")
+    raise ValueError(f"Unknown leaderboard backend: {backend}")
+
+class BackgroundWriter:
+    # Takes score writes off the game loop. Scores queued while a write is in
+    # progress are committed together in the next batch. `first` is called
+    # on the writer's thread before anything is written.
+    def __init__(self, storage, max_batch=100, first=None):
+        self.storage = storage
+        self.max_batch = max_batch
+        self.first = first
+        self.pending = queue.Queue()
+        self.thread = threading.Thread(target=self.run, name="leaderboard-writer", daemon=True)
+        self.thread.start()
+
+    def submit(self, record):
+        self.pending.put(record)
+
+    def run(self):
+        if self.first is not None:
+            self.first()
+        while True:
+            record = self.pending.get()
+            if record is None:
+                self.pending.task_done()
+                break
+
+            batch = [record]
+            stop = False
+            while len(batch) < self.max_batch:
+                try:
+                    record = self.pending.get_nowait()
+                except queue.Empty:
+                    break
+                if record is None:
+                    stop = True
+                    break
+                batch.append(record)
+
+            try:
+                self.storage.append_many(batch)
+            except Exception as e:
+                print(f"Error saving leaderboard: {e}")
+            for _ in range(len(batch) + stop):
+                self.pending.task_done()
+            if stop:
+                break
+
+        self.storage.close()
+
+    def flush(self):
+        # Block until everything submitted so far is committed
+        self.pending.join()
+
+    def close(self):
+        if self.thread.is_alive():
+            self.pending.put(None)
+            self.thread.join()
@@ -1,19 +1,42 @@
 import pygame
 import random
-import numpy as np
 from settings import *
+import game_clock
 from player import Player
 from obstacle import Obstacle, MovingObstacle
 from powerup import PowerUp
+from spatial_hash import PlatformGroup
+from entity_store import EntityGroup
+from surface_cache import surface_cache, RANDOM_VARIANTS
+from chunk_generator import ChunkGenerator
+from level_format import CompiledLevel
+from profiler import frame_profiler
+from parallax import ParallaxBackground
+from pool import SpritePool, place
+from strip_renderer import StripRenderer
+from view_window import ViewWindow
+from timers import TimerQueue
+from sweep_index import SweepIndex
 
 class Platform(pygame.sprite.Sprite):
     def __init__(self, x, y, width, height, platform_type="normal"):
         super().__init__()
+        self.blink_timer = None
+        self.reset(x, y, width, height, platform_type)
+    
+    def reset(self, x, y, width, height, platform_type="normal"):
+        # Also called on pooled platforms being reused (see pool.py)
+        self.stop_blinking()
         self.platform_type = platform_type
         self.image = self.create_platform_surface(width, height)
-        self.rect = self.image.get_rect(topleft=(x, y))
+        place(self, x, y)
         self.speed = SCROLL_SPEED
         
+        # Every platform is moved in batches by the group's KinematicStore;
+        # disappearing ones blink on a timer (see start_blinking)
+        self.motion = "scroll"
+        self.strip = None  # ChunkStrip the platform is drawn into, if any
+        
         # For breakable platforms
         self.durability = 3 if platform_type == "breakable" else -1
         
@@ -23,18 +46,26 @@ class Platform(pygame.sprite.Sprite):
         self.blink_interval = 200  # milliseconds
         
     def create_platform_surface(self, width, height):
+        variant = self.platform_type
+        if self.platform_type == "breakable":
+            variant = (self.platform_type, random.randrange(RANDOM_VARIANTS))
+        return surface_cache.get("platform", (width, height), variant,
+                                 lambda: self.draw_platform_surface(width, height, variant))
+    
+    def draw_platform_surface(self, width, height, variant):
         surface = pygame.Surface((width, height), pygame.SRCALPHA)
         
         if self.platform_type == "normal":
             pygame.draw.rect(surface, GREEN, (0, 0, width, height))
         elif self.platform_type == "breakable":
             pygame.draw.rect(surface, YELLOW, (0, 0, width, height))
-            # Add cracks
+            # Add cracks (seeded by the variant so every copy looks the same)
+            rng = random.Random(variant[1])
             for _ in range(3):
-                start_x = random.randint(0, width-20)
-                start_y = random.randint(0, height-5)
-                end_x = start_x + random.randint(10, 20)
-                end_y = start_y + random.randint(3, 5)
+                start_x = rng.randint(0, width-20)
+                start_y = rng.randint(0, height-5)
+                end_x = start_x + rng.randint(10, 20)
+                end_y = start_y + rng.randint(3, 5)
                 pygame.draw.line(surface, BLACK, (start_x, start_y), (end_x, end_y), 2)
         elif self.platform_type == "disappearing":
             pygame.draw.rect(surface, BLUE, (0, 0, width, height))
@@ -44,26 +75,38 @@ class Platform(pygame.sprite.Sprite):
         
         return surface
     
+    def start_blinking(self, timers):
+        # Blinks more than blink_interval ms apart, the first once the
+        # interval has passed since disappear_timer
+        self.blink_timer = timers.schedule_at(self.disappear_timer + self.blink_interval + 1, self.blink, timers)
+    
+    def stop_blinking(self):
+        if self.blink_timer is not None:
+            self.blink_timer.cancel()
+            self.blink_timer = None
+    
+    def blink(self, timers):
+        self.visible = not self.visible
+        self.disappear_timer = game_clock.get_ticks()
+        
+        if not self.visible:
+            self.rect.y = SCREEN_HEIGHT + 100  # Move off-screen when invisible
+        else:
+            self.rect.y -= SCREEN_HEIGHT + 100  # Move back when visible
+        self.start_blinking(timers)
+    
     def update(self):
         # Move platform to the left (scrolling effect)
         self.rect.x -= self.speed
         
-        # Handle disappearing platforms
-        if self.platform_type == "disappearing":
-            current_time = pygame.time.get_ticks()
-            if current_time - self.disappear_timer > self.blink_interval:
-                self.visible = not self.visible
-                self.disappear_timer = current_time
-                
-                if not self.visible:
-                    self.rect.y = SCREEN_HEIGHT + 100  # Move off-screen when invisible
-                else:
-                    self.rect.y -= SCREEN_HEIGHT + 100  # Move back when visible
-        
         # Remove if off-screen
         if self.rect.right < 0:
             self.kill()
     
+    def kill(self):
+        self.stop_blinking()
+        super().kill()
+    
     def damage(self):
         if self.platform_type == "breakable":
             self.durability -= 1
@@ -73,12 +116,20 @@ class Platform(pygame.sprite.Sprite):
 class Coin(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
+        self.reset(x, y)
+    
+    def reset(self, x, y):
         self.image = self.create_coin_surface()
-        self.rect = self.image.get_rect(topleft=(x, y))
+        place(self, x, y)
         self.speed = SCROLL_SPEED
+        self.motion = "scroll"
+        self.strip = None
         self.value = 10
         
     def create_coin_surface(self):
+        return surface_cache.get("coin", (30, 30), None, self.draw_coin_surface)
+    
+    def draw_coin_surface(self):
         surface = pygame.Surface((30, 30), pygame.SRCALPHA)  # Increase size
         pygame.draw.circle(surface, YELLOW, (15, 15), 15)  # Increase radius
         return surface
@@ -94,13 +145,21 @@ class Coin(pygame.sprite.Sprite):
 class Checkpoint(pygame.sprite.Sprite):
     def __init__(self, x, y):
         super().__init__()
+        self.reset(x, y)
+    
+    def reset(self, x, y):
         self.activated = False  # Initialize the activated attribute
         self.image = self.create_checkpoint_surface()
-        self.rect = self.image.get_rect(topleft=(x, y))
+        place(self, x, y)
         self.speed = SCROLL_SPEED
+        self.motion = "scroll"
+        self.strip = None
         self.value = 50
         
     def create_checkpoint_surface(self):
+        return surface_cache.get("checkpoint", (30, 80), self.activated, self.draw_checkpoint_surface)
+    
+    def draw_checkpoint_surface(self):
         surface = pygame.Surface((30, 80), pygame.SRCALPHA)
         # Ensure the color reflects the current state of activated
         color = WHITE if self.activated else GREEN
@@ -112,6 +171,8 @@ class Checkpoint(pygame.sprite.Sprite):
         if not self.activated:
             self.activated = True
             self.image = self.create_checkpoint_surface()  # Update the surface when activated
+            if self.strip is not None:
+                self.strip.redraw(self)
             return True
         return False
     
@@ -123,26 +184,59 @@ class Checkpoint(pygame.sprite.Sprite):
         if self.rect.right < 0:
             self.kill()
 
+# Groups players collide with, in the order Level.update handles them
+CONTACT_KINDS = ("coins", "checkpoints", "powerups", "obstacles")
+
+def lagged_position(sprite, lag):
+    # Where a sprite was drawn `lag` of a physics step ago. Scrolling sprites
+    # were one scroll step further right; oscillating obstacles move by their
+    # own rules, so they are drawn where the last step left them.
+    if sprite.motion == "oscillate":
+        return sprite.rect.topleft
+    return (sprite.rect.x + round(sprite.speed * lag), sprite.rect.y)
+
+# Spare sprites per entity type, shared by every Level in the process so a
+# restarted level reuses the previous run's sprites as well
+sprite_pools = {
+    "platforms": SpritePool(Platform, SPRITE_POOL_LIMIT),
+    "obstacles": SpritePool(MovingObstacle, SPRITE_POOL_LIMIT),
+    "powerups": SpritePool(PowerUp, SPRITE_POOL_LIMIT),
+    "coins": SpritePool(Coin, SPRITE_POOL_LIMIT),
+    "checkpoints": SpritePool(Checkpoint, SPRITE_POOL_LIMIT),
+}
+
 class Level:
-    def __init__(self, level_data):
+    def __init__(self, level_data, seed=None, threaded=True, chunk_source=None):
         self.name = level_data["name"]
         self.background_image = level_data["background"]
         self.platform_density = level_data["platform_density"]
         self.obstacle_density = level_data["obstacle_density"]
         self.powerup_density = level_data["powerup_density"]
-        self.scroll_speed = level_data["scroll_speed"]
+        self.scroll_speed = per_step(level_data["scroll_speed"])  # level data is in 60 Hz steps
         self.coin_density = level_data["coin_density"]
         
         # Set global scroll speed
         global SCROLL_SPEED
         SCROLL_SPEED = self.scroll_speed
         
-        # Create sprite groups
-        self.platforms = pygame.sprite.Group()
-        self.obstacles = pygame.sprite.Group()
-        self.powerups = pygame.sprite.Group()
-        self.coins = pygame.sprite.Group()
-        self.checkpoints = pygame.sprite.Group()
+        # Create sprite groups; sprites that leave them go back to the pools.
+        # Everything players can touch is also kept in one x-sorted index,
+        # in the order collisions are handled.
+        self.contacts = SweepIndex(CONTACT_KINDS)
+        self.platforms = PlatformGroup(self.scroll_speed, pool=sprite_pools["platforms"])
+        self.obstacles = EntityGroup(pool=sprite_pools["obstacles"], index=self.contacts, kind="obstacles")
+        self.powerups = EntityGroup(pool=sprite_pools["powerups"], index=self.contacts, kind="powerups")
+        self.coins = EntityGroup(pool=sprite_pools["coins"], index=self.contacts, kind="coins")
+        self.checkpoints = EntityGroup(pool=sprite_pools["checkpoints"], index=self.contacts, kind="checkpoints")
+        
+        # Static chunk geometry drawn from composited strips (see strip_renderer.py)
+        self.strips = StripRenderer(self) if STATIC_STRIPS else None
+        
+        # Entities spawned ahead of the camera sleep until they are near it
+        self.window = ViewWindow()
+        
+        # Blinks of disappearing platforms, fired when due (see timers.py)
+        self.timers = TimerQueue()
         
         # Level generation variables
         self.level_length = 10000  # pixels
@@ -150,147 +244,196 @@ class Level:
         self.last_platform_x = 0
         self.ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
         
-        # Initialize background positions for parallax effect
-        self.bg_positions = [0, SCREEN_WIDTH]  # Initialize bg_positions
+        # Precompiled courses are read from their file instead of generated
+        if chunk_source is None and level_data.get("compiled"):
+            chunk_source = CompiledLevel(level_data["compiled"])
+        if chunk_source is not None and seed is None:
+            seed = chunk_source.seed
+        
+        # Per-level RNG: the same seed always gives the same level
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.rng = random.Random(seed)
+        chunk_seed = self.rng.randrange(2 ** 32)
         
         # Create the ground
         self.create_ground()
         
-        # Generate initial level elements
-        self.generate_level_segment(SCREEN_WIDTH * 2)
+        # Level chunks are generated ahead of time (on a worker thread when
+        # threaded) and spliced in as the camera approaches them
+        if chunk_source is not None:
+            self.chunks = chunk_source
+            self.level_length = getattr(chunk_source, "length", self.level_length)
+        else:
+            self.chunks = ChunkGenerator(level_data, chunk_seed, self.last_platform_x, threaded=threaded)
         
-        # Background for parallax effect
-        self.bg_image = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.bg_image.fill((100, 150, 255))  # Sky blue as fallback
+        # Generate initial level elements
+        self.generate_level_segment()
         
-        # Create a simple background based on level theme
-        if "desert" in self.name.lower():
-            self.bg_image.fill((230, 190, 100))  # Sandy color
-        elif "ice" in self.name.lower():
-            self.bg_image.fill((200, 230, 255))  # Light blue
-        else:
-            self.bg_image.fill((100, 180, 255))  # Sky blue
-        
-        # Add simple decorations
-        for _ in range(20):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = random.randint(0, SCREEN_HEIGHT // 2)
-            size = random.randint(5, 15)
-            color = (255, 255, 255, 150)  # Semi-transparent white
-            pygame.draw.circle(self.bg_image, color, (x, y), size)
+        # Parallax background; the layers are themed by level name (see parallax.py)
+        self.background = ParallaxBackground(self.name)
     
     def create_ground(self):
         # Create the ground platform
-        ground = Platform(0, self.ground_y, SCREEN_WIDTH * 2, GROUND_HEIGHT, "normal")
+        ground = sprite_pools["platforms"].acquire(0, self.ground_y, SCREEN_WIDTH * 2, GROUND_HEIGHT, "normal")
         self.platforms.add(ground)
         self.last_platform_x = SCREEN_WIDTH * 2
     
-    def generate_level_segment(self, width):
-        x = self.last_platform_x
-        while x < self.last_platform_x + width:
-            if random.random() < self.platform_density:
-                platform_width = random.randint(100, 300)
-                platform_height = random.randint(20, 40)
-                platform_y = random.randint(200, self.ground_y - 50)
-                platform = Platform(x, platform_y, platform_width, platform_height)
-                self.platforms.add(platform)
-
-                # Add coins on the platform
-                if random.random() < self.coin_density:  # Adjust coin density
-                    for i in range(random.randint(3, 6)):  # Add multiple coins
-                        coin_x = x + i * 25 + 10  # Space coins evenly
-                        coin_y = platform_y - 30  # Place coins above the platform
-                        coin = Coin(coin_x, coin_y)
-                        self.coins.add(coin)
-
-                x += platform_width + random.randint(100, 300)
-            else:
-                x += random.randint(100, 200)
-        
-        # Add checkpoints every 1000 pixels
-        checkpoint_spacing = 1000
-        checkpoint_start = (self.last_platform_x // checkpoint_spacing + 1) * checkpoint_spacing
-        for x in range(checkpoint_start, self.last_platform_x + width, checkpoint_spacing):
-            checkpoint = Checkpoint(x, self.ground_y - 80)
-            self.checkpoints.add(checkpoint)
-        
-        # Add moving obstacles
-        for _ in range(int((width / 1000) * self.obstacle_density * 5)):
-            obstacle_x = self.last_platform_x + random.randint(0, width)
-            obstacle_y = random.randint(100, self.ground_y - 100)
-            obstacle_width = random.randint(30, 60)
-            obstacle_height = random.randint(20, 40)
-            vertical = random.choice([True, False])
-            move_distance = random.randint(50, 150)
-            move_speed = random.uniform(1, 3)
-            
-            moving_obstacle = MovingObstacle(
-                obstacle_x, obstacle_y, obstacle_width, obstacle_height,
-                "moving_platform", move_distance, move_speed, vertical
-            )
-            self.obstacles.add(moving_obstacle)
+    def generate_level_segment(self):
+        # Splice the next ready chunk into the level
+        chunk = self.chunks.next_chunk()
+        self.spawn_chunk(chunk)
+        self.last_platform_x = chunk.end_x
+    
+    def spawn_chunk(self, chunk):
+        # Sprites beyond the view window sleep until they scroll into it
+        pool = sprite_pools["platforms"]
+        platforms = [pool.acquire(x, y, width, height, platform_type)
+                     for x, y, width, height, platform_type in chunk.platforms]
+        for platform in platforms:
+            if platform.platform_type == "disappearing":
+                platform.start_blinking(self.timers)
+        
+        pool = sprite_pools["coins"]
+        coins = [pool.acquire(x, y) for x, y in chunk.coins]
         
-        self.last_platform_x += width
+        pool = sprite_pools["checkpoints"]
+        checkpoints = [pool.acquire(x, y) for x, y in chunk.checkpoints]
+        
+        if self.strips is not None:
+            self.strips.add_chunk(platforms, coins, checkpoints)
+        self.window.add(self.platforms, platforms)
+        self.window.add(self.coins, coins)
+        self.window.add(self.checkpoints, checkpoints)
+        
+        pool = sprite_pools["obstacles"]
+        obstacles = [pool.acquire(x, y, width, height, obstacle_type, move_distance, move_speed, vertical)
+                     for x, y, width, height, obstacle_type, move_distance, move_speed, vertical in chunk.obstacles]
+        self.window.add(self.obstacles, obstacles)
+    
+    def spawn_powerup(self, x, y, powerup_type):
+        self.window.add(self.powerups, [sprite_pools["powerups"].acquire(x, y, powerup_type)])
+    
+    def pool_stats(self):
+        return {name: pool.stats() for name, pool in sprite_pools.items()}
+    
+    def close(self):
+        # Stop the chunk generator's worker thread and hand the remaining
+        # sprites back to the pools for the next level
+        self.chunks.close()
+        if self.strips is not None:
+            self.strips.clear()
+        self.window.clear()
+        self.timers.clear()
+        for group in (self.platforms, self.obstacles, self.powerups, self.coins, self.checkpoints):
+            group.empty()
     
     def update(self, players):
+        # Timers first, where disappearing platforms used to blink in their update()
+        self.timers.run()
+        
         # Update all sprite groups
         self.platforms.update()
         self.obstacles.update()
         self.powerups.update()
         self.coins.update()
         self.checkpoints.update()
+        self.contacts.advance()
+        self.window.update()
         
         # Generate more level if needed
         if self.last_platform_x - self.level_position < SCREEN_WIDTH * 2:
-            self.generate_level_segment(SCREEN_WIDTH)
+            frame_profiler.mark("level")
+            self.generate_level_segment()
+            frame_profiler.mark("generate")
         
         # Update level position
         self.level_position += SCROLL_SPEED
         
         # Update background for parallax effect
-        self.bg_positions[0] -= SCROLL_SPEED * 0.5
-        self.bg_positions[1] -= SCROLL_SPEED * 0.5
+        self.background.update(SCROLL_SPEED)
         
-        if self.bg_positions[0] <= -SCREEN_WIDTH:
-            self.bg_positions[0] = self.bg_positions[1] + SCREEN_WIDTH
-        if self.bg_positions[1] <= -SCREEN_WIDTH:
-            self.bg_positions[1] = self.bg_positions[0] + SCREEN_WIDTH
-        
-        # Check collisions for each player
+        # Check collisions for each player; one index query finds the coins,
+        # checkpoints, power-ups and obstacles it touches, in that order.
+        # With swept collisions, everything it passed on the way counts.
         for player in players:
-            # Check collision with coins
-            coin_collisions = pygame.sprite.spritecollide(player, self.coins, True)
-            for coin in coin_collisions:
-                player.score += coin.value
-                player.coins += 1
-            
-            # Check collision with checkpoints
-            checkpoint_collisions = pygame.sprite.spritecollide(player, self.checkpoints, False)
-            for checkpoint in checkpoint_collisions:
-                if checkpoint.activate():
-                    player.score += checkpoint.value
-                    player.checkpoints += 1
-            
-            # Check collision with power-ups
-            powerup_collisions = pygame.sprite.spritecollide(player, self.powerups, True)
-            for powerup in powerup_collisions:
-                player.apply_powerup(powerup.powerup_type, powerup.duration)
+            hit_obstacle = False
+            for kind, sprite in self.contacts.query(player.swept_rect() if player.swept else player.rect):
+                if kind == "coins":
+                    sprite.kill()
+                    player.score += sprite.value
+                    player.coins += 1
+                elif kind == "checkpoints":
+                    if sprite.activate():
+                        player.score += sprite.value
+                        player.checkpoints += 1
+                elif kind == "powerups":
+                    sprite.kill()
+                    player.apply_powerup(sprite.powerup_type, sprite.duration)
+                else:
+                    hit_obstacle = True
             
             # Check collision with obstacles
-            obstacle_collisions = pygame.sprite.spritecollide(player, self.obstacles, False)
-            if obstacle_collisions:
+            if hit_obstacle:
                 # Reset player position (simple collision handling)
                 player.rect.x -= 50
                 player.score -= 20  # Penalty for hitting obstacles
+                player.collisions += 1
+    
+    def draw(self, screen, interpolation=1.0):
+        self.draw_background(screen, interpolation=interpolation)
+        self.draw_sprites(screen, interpolation)
+    
+    def draw_background(self, screen, areas=None, interpolation=1.0):
+        # Whole screen, or only the given areas (dirty-rect rendering)
+        self.background.draw(screen, areas, interpolation)
     
-    def draw(self, screen):
-        # Draw background with parallax effect
-        screen.blit(self.bg_image, (self.bg_positions[0], 0))
-        screen.blit(self.bg_image, (self.bg_positions[1], 0))
+    def background_dirty_rects(self):
+        # Screen areas the background changed since it was last drawn
+        return self.background.dirty_rects()
+    
+    def visible_rects(self):
+        # Rects of every sprite that lands on screen when drawn
+        screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        rects = []
+        for group in (self.platforms, self.obstacles, self.powerups, self.coins, self.checkpoints):
+            for sprite in group:
+                if sprite.rect.colliderect(screen_rect):
+                    rects.append(sprite.rect.clip(screen_rect))
+        return rects
+    
+    def draw_sprites(self, screen, interpolation=1.0):
+        if self.strips is not None:
+            self.draw_strips(screen, interpolation)
+            return
+        groups = (self.platforms, self.obstacles, self.powerups, self.coins, self.checkpoints)
         
         # Draw all sprite groups
-        self.platforms.draw(screen)
-        self.obstacles.draw(screen)
-        self.powerups.draw(screen)
-        self.coins.draw(screen)
-        self.checkpoints.draw(screen) 
\ No newline at end of file
+        if interpolation >= 1.0:
+            for group in groups:
+                group.draw(screen)
+            return
+        
+        # Between physics steps: scrolling entities were one step further right
+        lag = 1.0 - interpolation
+        for group in groups:
+            screen.blits([(sprite.image, lagged_position(sprite, lag)) for sprite in group], doreturn=False)
+    
+    def draw_strips(self, screen, interpolation=1.0):
+        # Same layering as draw_sprites, with each chunk's platforms, coins
+        # and checkpoints blitted as one strip per layer. Sprites outside
+        # the strips (the ground, disappearing platforms) are drawn singly.
+        lag = 1.0 - interpolation
+        
+        def draw_each(sprites):
+            screen.blits([(sprite.image, lagged_position(sprite, lag)) for sprite in sprites], doreturn=False)
+        
+        self.strips.draw(screen, "platforms", lag)
+        draw_each(sprite for sprite in self.platforms if sprite.strip is None)
+        draw_each(self.obstacles)
+        draw_each(self.powerups)
+        self.strips.draw(screen, "coins", lag)
+        draw_each(sprite for sprite in self.coins if sprite.strip is None)
+        self.strips.draw(screen, "checkpoints", lag)
+        draw_each(sprite for sprite in self.checkpoints if sprite.strip is None)
@@ -0,0 +1,181 @@
+import argparse
+import json
+import random
+import struct
+import numpy as np
+from settings import *
+from chunk_generator import Chunk, ChunkGenerator
+
+# Compiled level file layout (little endian):
+#   header      MAGIC, version, chunk count, entity count, seed (signed), metadata length
+#   metadata    UTF-8 JSON: the LEVELS entry plus the compiled length
+#   chunks      CHUNK_DTYPE records, one per chunk, in order
+#   entities    ENTITY_DTYPE records grouped by chunk
+# Sections start on 8-byte boundaries so they can be mapped in place.
+MAGIC = b"PRLV"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxIIqI")
+
+ENTITY_PLATFORM = 0
+ENTITY_COIN = 1
+ENTITY_CHECKPOINT = 2
+ENTITY_OBSTACLE = 3
+
+PLATFORM_TYPES = ["normal", "breakable", "disappearing"]
+OBSTACLE_TYPES = ["moving_platform", "spike", "fire"]
+
+CHUNK_DTYPE = np.dtype([
+    ("start_x", "<i8"),
+    ("width", "<i4"),
+    ("first", "<u4"),
+    ("count", "<u4"),
+])
+
+ENTITY_DTYPE = np.dtype([
+    ("kind", "u1"),
+    ("subtype", "u1"),
+    ("vertical", "u1"),
+    ("x", "<i8"),
+    ("y", "<i4"),
+    ("width", "<i2"),
+    ("height", "<i2"),
+    ("move_distance", "<i2"),
+    ("move_speed", "<f8"),
+])
+
+def align(offset):
+    return (offset + 7) // 8 * 8
+
+def chunk_records(chunk):
+    records = []
+    for x, y, width, height, platform_type in chunk.platforms:
+        records.append((ENTITY_PLATFORM, PLATFORM_TYPES.index(platform_type), 0, x, y, width, height, 0, 0.0))
+    for x, y in chunk.coins:
+        records.append((ENTITY_COIN, 0, 0, x, y, 30, 30, 0, 0.0))
+    for x, y in chunk.checkpoints:
+        records.append((ENTITY_CHECKPOINT, 0, 0, x, y, 30, 80, 0, 0.0))
+    for x, y, width, height, obstacle_type, move_distance, move_speed, vertical in chunk.obstacles:
+        records.append((ENTITY_OBSTACLE, OBSTACLE_TYPES.index(obstacle_type), int(vertical),
+                        x, y, width, height, move_distance, move_speed))
+    return records
+
+def compile_level(level_data, path, seed, length=10000):
+    # Generates `length` pixels of level after the starting ground and writes
+    # them as a compiled level file. The chunk seed is derived the same way
+    # Level does, so the result matches Level(level_data, seed=seed).
+    generator = ChunkGenerator(level_data, random.Random(seed).randrange(2 ** 32), SCREEN_WIDTH * 2,
+                               threaded=False)
+    chunks = []
+    entities = []
+    covered = 0
+    while covered < length:
+        chunk = generator.next_chunk()
+        records = chunk_records(chunk)
+        chunks.append((chunk.start_x, chunk.width, len(entities), len(records)))
+        entities.extend(records)
+        covered += chunk.width
+
+    chunk_array = np.array(chunks, dtype=CHUNK_DTYPE)
+    entity_array = np.array(entities, dtype=ENTITY_DTYPE)
+    metadata = json.dumps({"level": level_data, "length": covered}).encode("utf-8")
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(MAGIC, VERSION, len(chunk_array), len(entity_array), seed, len(metadata)))
+        file.write(metadata)
+        file.write(b"\0" * (align(file.tell()) - file.tell()))
+        file.write(chunk_array.tobytes())
+        file.write(b"\0" * (align(file.tell()) - file.tell()))
+        file.write(entity_array.tobytes())
+
+    return {"chunks": len(chunk_array), "entities": len(entity_array), "length": covered}
+
+class CompiledLevel:
+    # Chunk source backed by a memory-mapped compiled level. Only the chunk
+    # being spliced in is turned into a Chunk, so memory use follows the
+    # camera window rather than the level length. Past the last chunk the
+    # level continues as empty space.
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as file:
+            header = file.read(HEADER.size)
+            magic, version, chunk_count, entity_count, seed, metadata_length = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a compiled level (version {VERSION})")
+            metadata = json.loads(file.read(metadata_length).decode("utf-8"))
+
+        self.seed = seed
+        self.level_data = metadata["level"]
+        self.length = metadata["length"]
+
+        chunks_offset = align(HEADER.size + metadata_length)
+        entities_offset = align(chunks_offset + chunk_count * CHUNK_DTYPE.itemsize)
+        self.chunks = np.memmap(path, dtype=CHUNK_DTYPE, mode="r", offset=chunks_offset, shape=(chunk_count,)) \
+            if chunk_count else np.zeros(0, dtype=CHUNK_DTYPE)
+        self.entities = np.memmap(path, dtype=ENTITY_DTYPE, mode="r", offset=entities_offset, shape=(entity_count,)) \
+            if entity_count else np.zeros(0, dtype=ENTITY_DTYPE)
+        self.next_index = 0
+
+    def __len__(self):
+        return len(self.chunks)
+
+    def chunk(self, index):
+        record = self.chunks[index]
+        chunk = Chunk(index, int(record["start_x"]), int(record["width"]))
+        first = int(record["first"])
+        for entity in self.entities[first:first + int(record["count"])].tolist():
+            kind, subtype, vertical, x, y, width, height, move_distance, move_speed = entity
+            if kind == ENTITY_PLATFORM:
+                chunk.platforms.append((x, y, width, height, PLATFORM_TYPES[subtype]))
+            elif kind == ENTITY_COIN:
+                chunk.coins.append((x, y))
+            elif kind == ENTITY_CHECKPOINT:
+                chunk.checkpoints.append((x, y))
+            elif kind == ENTITY_OBSTACLE:
+                chunk.obstacles.append((x, y, width, height, OBSTACLE_TYPES[subtype],
+                                        move_distance, move_speed, bool(vertical)))
+        return chunk
+
+    def next_chunk(self):
+        if self.next_index < len(self.chunks):
+            chunk = self.chunk(self.next_index)
+        else:
+            # Ran off the end of the course: keep scrolling through empty space
+            previous_end = SCREEN_WIDTH * 2
+            if len(self.chunks):
+                last = self.chunks[-1]
+                previous_end = int(last["start_x"]) + int(last["width"])
+            extra = self.next_index - len(self.chunks)
+            chunk = Chunk(self.next_index, previous_end + extra * SCREEN_WIDTH, SCREEN_WIDTH)
+        self.next_index += 1
+        return chunk
+
+    def close(self):
+        # Release the maps so the file can be unmapped
+        self.chunks = np.zeros(0, dtype=CHUNK_DTYPE)
+        self.entities = np.zeros(0, dtype=ENTITY_DTYPE)
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile Pixel Runners levels")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    compile_parser = subparsers.add_parser("compile", help="generate a level and write it to a file")
+    compile_parser.add_argument("output")
+    compile_parser.add_argument("--level", type=int, default=0, help="index into LEVELS")
+    compile_parser.add_argument("--seed", type=int, default=0)
+    compile_parser.add_argument("--length", type=int, default=10000, help="course length in pixels")
+
+    info_parser = subparsers.add_parser("info", help="describe a compiled level")
+    info_parser.add_argument("path")
+
+    args = parser.parse_args()
+    if args.command == "compile":
+        result = compile_level(LEVELS[args.level], args.output, args.seed, args.length)
+        print(f"Wrote {args.output}: {result['chunks']} chunks, {result['entities']} entities, "
+              f"{result['length']} px")
+    else:
+        level = CompiledLevel(args.path)
+        print(f"{level.level_data['name']} (seed {level.seed}): {len(level)} chunks, "
+              f"{len(level.entities)} entities, {level.length} px")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
+import sys
+import time
+import_start = time.perf_counter()
 from game import Game
+import_seconds = time.perf_counter() - import_start
 
 if __name__ == "__main__":
     game = Game()
-    game.run() 
\ No newline at end of file
+    # --startup-report prints where the time to the first menu frame went
+    game.startup_times = {"import": import_seconds, **game.startup_times}
+    game.startup_report = "--startup-report" in sys.argv
+    game.run()
\ No newline at end of file
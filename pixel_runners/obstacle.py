@@ -1,27 +1,41 @@
 import pygame
 import random
-import numpy as np
 from settings import *
+from surface_cache import surface_cache, RANDOM_VARIANTS
+from pool import place
 
 class Obstacle(pygame.sprite.Sprite):
     def __init__(self, x, y, width, height, obstacle_type="spike"):
         super().__init__()
+        self.reset(x, y, width, height, obstacle_type)
+    
+    def reset(self, x, y, width, height, obstacle_type="spike"):
+        # Also called on pooled obstacles being reused (see pool.py)
         self.obstacle_type = obstacle_type
         self.image = self.create_obstacle_surface(width, height)
-        self.rect = self.image.get_rect(topleft=(x, y))
+        place(self, x, y)
         self.speed = SCROLL_SPEED
+        self.motion = "scroll"
         
     def create_obstacle_surface(self, width, height):
+        variant = self.obstacle_type
+        if self.obstacle_type == "fire":
+            variant = (self.obstacle_type, random.randrange(RANDOM_VARIANTS))
+        return surface_cache.get("obstacle", (width, height), variant,
+                                 lambda: self.draw_obstacle_surface(width, height, variant))
+    
+    def draw_obstacle_surface(self, width, height, variant):
         surface = pygame.Surface((width, height), pygame.SRCALPHA)
         
         if self.obstacle_type == "spike":
             # Draw a triangle for spikes
             pygame.draw.polygon(surface, RED, [(0, height), (width/2, 0), (width, height)])
         elif self.obstacle_type == "fire":
-            # Draw a fire obstacle
+            # Draw a fire obstacle (flames seeded by the variant)
             pygame.draw.rect(surface, YELLOW, (0, 0, width, height))
+            rng = random.Random(variant[1])
             for i in range(5):
-                x = random.randint(0, width-10)
+                x = rng.randint(0, width-10)
                 pygame.draw.circle(surface, RED, (x, 5), 5)
         else:
             # Default obstacle
@@ -39,13 +53,30 @@ class Obstacle(pygame.sprite.Sprite):
 
 class MovingObstacle(Obstacle):
     def __init__(self, x, y, width, height, obstacle_type="moving_platform", move_distance=100, move_speed=2, vertical=False):
-        super().__init__(x, y, width, height, obstacle_type)
+        pygame.sprite.Sprite.__init__(self)
+        self.start_pos = pygame.math.Vector2(x, y)
+        self.reset(x, y, width, height, obstacle_type, move_distance, move_speed, vertical)
+    
+    def reset(self, x, y, width, height, obstacle_type="moving_platform", move_distance=100, move_speed=2, vertical=False):
+        super().reset(x, y, width, height, obstacle_type)
         self.vertical = vertical
         self.move_distance = move_distance
-        self.move_speed = move_speed
-        self.start_pos = pygame.math.Vector2(x, y)
+        self.move_speed = per_step(move_speed)  # level data is in 60 Hz steps
+        self.start_pos.update(x, y)
         self.direction = 1
         self.progress = 0
+        self.motion = "oscillate"
+        
+    def skip(self, ticks):
+        # Apply `ticks` updates at once; a vertical obstacle waking up in the
+        # view window catches up on the frames it slept through
+        for _ in range(ticks):
+            self.progress += self.move_speed * self.direction
+            if abs(self.progress) > self.move_distance:
+                self.direction *= -1
+                self.progress = self.move_distance * self.direction
+        self.rect.x -= SCROLL_SPEED * ticks
+        self.rect.y = self.start_pos.y + self.progress
         
     def update(self):
         # Move obstacle left (scrolling)
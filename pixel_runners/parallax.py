@@ -0,0 +1,239 @@
+import math
+import random
+import pygame
+from settings import *
+
+# Colour keyed out of the transparent layers
+COLORKEY = (255, 0, 255)
+
+# Background layers, back to front: (name, scroll factor, top, height).
+# A layer moves scroll factor times as fast as the level. The hills run on
+# behind the ground to the bottom of the screen, so their solid part hides
+# every sky row below it.
+LAYERS = (
+    ("sky", 0.2, 0, SCREEN_HEIGHT),
+    ("hills", 0.4, SCREEN_HEIGHT - GROUND_HEIGHT - 220, 220 + GROUND_HEIGHT),
+    ("props", 0.7, SCREEN_HEIGHT - GROUND_HEIGHT - 120, 120),
+)
+
+# Width of the tile columns the hill outline is split into for dirty rects
+OUTLINE_SEGMENT = 32
+
+# Colours per theme: sky, clouds, hills, props
+THEMES = {
+    "hills": ((100, 180, 255), (200, 228, 255), (80, 160, 90), (40, 110, 50)),
+    "desert": ((230, 190, 100), (245, 230, 200), (205, 155, 80), (90, 140, 60)),
+    "ice": ((200, 230, 255), (235, 245, 255), (150, 180, 215), (225, 240, 255)),
+}
+
+# Built layers per theme. Tiles are the same for every level with the theme,
+# so they are drawn once per process and reused across level restarts.
+theme_layers = {}
+
+def theme_for(level_name):
+    name = level_name.lower()
+    if "desert" in name:
+        return "desert"
+    if "ice" in name:
+        return "ice"
+    return "hills"
+
+class ParallaxLayer:
+    def __init__(self, name, tile, factor, top, decorations=None):
+        self.name = name
+        self.tile = tile
+        self.factor = factor
+        self.top = top
+        self.band = pygame.Rect(0, top, SCREEN_WIDTH, tile.get_height())
+        # Rects in tile coordinates outside which the tile looks the same
+        # when it moves (clouds, props, the hill outline); None means the
+        # whole band changes
+        self.decorations = decorations
+        # Screen row from which this layer hides everything behind it, and
+        # the row below which layers in front of it hide this one
+        self.opaque_from = SCREEN_HEIGHT
+        self.visible_to = SCREEN_HEIGHT
+
+    def draw(self, screen, offset, area):
+        # Blit the visible slices of the repeating tile that fall in `area`
+        band = self.band.clip(area)
+        band.height = min(band.bottom, self.visible_to) - band.top
+        if band.width <= 0 or band.height <= 0:
+            return
+        width = self.tile.get_width()
+        start = int(offset)
+        x = band.left
+        while x < band.right:
+            tile_x = (start + x) % width
+            span = min(band.right - x, width - tile_x)
+            screen.blit(self.tile, (x, band.top), (tile_x, band.top - self.top, span, band.height))
+            x += span
+
+    def dirty_rects(self, old, new):
+        if int(old) == int(new):
+            return []
+        if self.decorations is None:
+            return [self.band]
+
+        width = self.tile.get_width()
+        moved = int(new) - int(old)
+        if abs(moved) >= width:
+            return [self.band]
+
+        # Each decoration covers everything between where it was and where
+        # it is, which also covers the hill outline sliding past a column
+        shift = -(int(old) % width)
+        rects = []
+        for copy in (shift - width, shift, shift + width, shift + 2 * width):
+            for decoration in self.decorations:
+                before = decoration.move(copy, self.top)
+                rects.append(before.union(before.move(-moved, 0)).inflate(2, 2))
+        return rects
+
+def display_format(surface, colorkey=None):
+    # Opaque tiles are converted to the display format and keyed tiles are
+    # RLE-encoded; both blit much faster than per-pixel alpha
+    if pygame.display.get_surface() is not None:
+        surface = surface.convert()
+    if colorkey is not None:
+        surface.set_colorkey(colorkey, pygame.RLEACCEL)
+    return surface
+
+def blend(color, other, amount):
+    return tuple(int(a + (b - a) * amount) for a, b in zip(color, other))
+
+def draw_sky(rng, sky, clouds, height):
+    surface = pygame.Surface((SCREEN_WIDTH, height))
+    surface.fill(sky)
+
+    # Lighter towards the horizon
+    for y in range(height // 2, height, 4):
+        surface.fill(blend(sky, clouds, 0.4 * (y - height // 2) / (height // 2)), (0, y, SCREEN_WIDTH, 4))
+
+    # Clouds stay clear of the tile edges so the repeat has no seam
+    decorations = []
+    for _ in range(8):
+        x = rng.randint(80, SCREEN_WIDTH - 80)
+        y = rng.randint(40, height // 3)
+        puffs = [pygame.draw.circle(surface, clouds, (x + dx, y + rng.randint(-8, 8)), rng.randint(15, 30))
+                 for dx in (-35, 0, 35)]
+        decorations.append(puffs[0].unionall(puffs[1:]))
+    return surface, decorations
+
+def draw_hills(rng, color, height, hill_height):
+    # The outline is laid out over the top hill_height rows; the tile is
+    # solid from there down to height
+    surface = pygame.Surface((SCREEN_WIDTH, height))
+    surface.fill(COLORKEY)
+
+    # Whole numbers of waves per tile keep the outline continuous across tiles
+    waves = [(rng.randint(1, 3), rng.uniform(20, 45), rng.uniform(0, 2 * math.pi)),
+             (rng.randint(4, 7), rng.uniform(8, 20), rng.uniform(0, 2 * math.pi))]
+    outline = []
+    for x in range(0, SCREEN_WIDTH + 1, 8):
+        y = hill_height * 0.45
+        for count, amplitude, phase in waves:
+            y += amplitude * math.sin(2 * math.pi * count * x / SCREEN_WIDTH + phase)
+        outline.append((x, int(y)))
+    pygame.draw.polygon(surface, color, [(0, height)] + outline + [(SCREEN_WIDTH, height)])
+
+    # Only the outline changes as the hills scroll: keyed above it, solid
+    # below. Each column segment's rect spans the outline points in it,
+    # including the ones it shares with its neighbours.
+    decorations = []
+    for left in range(0, SCREEN_WIDTH, OUTLINE_SEGMENT):
+        ys = [y for x, y in outline if left <= x <= left + OUTLINE_SEGMENT]
+        decorations.append(pygame.Rect(left, min(ys), OUTLINE_SEGMENT, max(ys) - min(ys) + 1))
+    # Rows below the lowest point of the outline are solid
+    return surface, decorations, max(y for _, y in outline) + 1
+
+def draw_props(rng, theme, color, height):
+    surface = pygame.Surface((SCREEN_WIDTH, height))
+    surface.fill(COLORKEY)
+
+    decorations = []
+    x = rng.randint(40, 120)
+    while x < SCREEN_WIDTH - 80:
+        size = rng.randint(40, 90)
+        if theme == "desert":
+            # Cactus
+            parts = [pygame.draw.rect(surface, color, (x, height - size, 14, size), border_radius=6),
+                     pygame.draw.rect(surface, color, (x - 14, height - size + 20, 14, 8)),
+                     pygame.draw.rect(surface, color, (x - 14, height - size + 4, 8, 24), border_radius=4)]
+        elif theme == "ice":
+            # Ice spike
+            parts = [pygame.draw.polygon(surface, color,
+                                         [(x - size // 4, height), (x, height - size), (x + size // 4, height)])]
+        else:
+            # Tree
+            parts = [pygame.draw.rect(surface, blend(color, BLACK, 0.4), (x - 4, height - size // 2, 8, size // 2)),
+                     pygame.draw.circle(surface, color, (x, height - size // 2), size // 3)]
+        decorations.append(parts[0].unionall(parts[1:]))
+        x += rng.randint(90, 240)
+    return surface, decorations
+
+def get_theme_layers(theme):
+    if theme not in theme_layers:
+        # Seeded by theme so every build of a theme looks the same
+        rng = random.Random(theme)
+        sky, clouds, hills, props = THEMES[theme]
+        layers = []
+        for name, factor, top, height in LAYERS:
+            if name == "sky":
+                tile, decorations = draw_sky(rng, sky, clouds, height)
+                layers.append(ParallaxLayer(name, display_format(tile), factor, top, decorations))
+            elif name == "hills":
+                tile, decorations, solid_from = draw_hills(rng, hills, height, height - GROUND_HEIGHT)
+                layers.append(ParallaxLayer(name, display_format(tile, COLORKEY), factor, top, decorations))
+                layers[-1].opaque_from = top + solid_from
+            else:
+                tile, decorations = draw_props(rng, theme, props, height)
+                layers.append(ParallaxLayer(name, display_format(tile, COLORKEY), factor, top, decorations))
+        
+        # Skip the rows of each layer that solid layers in front cover anyway.
+        # A front layer only hides the rows below its solid part if its band
+        # runs down to the bottom of the screen, as the hills' does.
+        for i, layer in enumerate(layers):
+            layer.visible_to = min([min(front.opaque_from, front.band.bottom) for front in layers[i + 1:]
+                                    if front.band.bottom >= SCREEN_HEIGHT], default=SCREEN_HEIGHT)
+        theme_layers[theme] = layers
+    return theme_layers[theme]
+
+class ParallaxBackground:
+    # Scroll state of one level's background. The layer tiles are fetched
+    # from the theme cache on the first draw, so headless runs never build them.
+    def __init__(self, level_name):
+        self.theme = theme_for(level_name)
+        self.offsets = [0.0 for _ in LAYERS]
+        self.previous_offsets = list(self.offsets)
+        self.drawn_offsets = None  # offsets of the frame last drawn
+
+    def update(self, scroll_speed):
+        self.previous_offsets = self.offsets
+        self.offsets = [offset + scroll_speed * factor for offset, (_, factor, _, _) in zip(self.offsets, LAYERS)]
+
+    def draw(self, screen, areas=None, interpolation=1.0):
+        layers = get_theme_layers(self.theme)
+        offsets = self.offsets
+        if areas is None:
+            # Interpolate between physics steps
+            areas = [screen.get_rect()]
+            if interpolation < 1.0:
+                offsets = [previous + (offset - previous) * interpolation
+                           for previous, offset in zip(self.previous_offsets, self.offsets)]
+
+        for area in areas:
+            for layer, offset in zip(layers, offsets):
+                layer.draw(screen, offset, area)
+        self.drawn_offsets = offsets
+
+    def dirty_rects(self):
+        # Screen areas that differ between the frame last drawn and now
+        screen_rect = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+        if self.drawn_offsets is None:
+            return [screen_rect]
+
+        rects = []
+        for layer, old, new in zip(get_theme_layers(self.theme), self.drawn_offsets, self.offsets):
+            rects.extend(layer.dirty_rects(old, new))
+        return [rect.clip(screen_rect) for rect in rects if rect.colliderect(screen_rect)]
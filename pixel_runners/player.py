@@ -1,6 +1,46 @@
 import pygame
-import numpy as np
 from settings import *
+import game_clock
+from spatial_hash import colliding_platforms
+from swept_collision import sweep
+from surface_cache import surface_cache
+from timers import TimerQueue
+import os
+
+# Animation frame sets per (skin, colour), built once per process and shared
+# by every Player. Each entry maps state -> (frames, mirrored frames).
+skin_animations = {}
+
+def load_skin_image(skin, color):
+    # The default skin is the generated rectangle in the player's colour;
+    # other skins use their image from CHARACTER_SKINS when it exists
+    filename = CHARACTER_SKINS.get(skin)
+    path = os.path.join(IMAGE_DIR, "characters", filename) if filename else None
+    if skin != "default" and path and os.path.exists(path):
+        image = pygame.transform.smoothscale(pygame.image.load(path), (PLAYER_WIDTH, PLAYER_HEIGHT))
+        return surface_cache.to_display_format(image)
+
+    return surface_cache.get("player", (PLAYER_WIDTH, PLAYER_HEIGHT), color,
+                             lambda: draw_player_surface(color))
+
+def draw_player_surface(color):
+    # Create a simple colored rectangle for the player
+    surface = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
+    pygame.draw.rect(surface, color, (0, 0, PLAYER_WIDTH, PLAYER_HEIGHT), border_radius=10)
+    return surface
+
+def load_skin_animations(skin, color):
+    key = (skin, color)
+    if key not in skin_animations:
+        image = load_skin_image(skin, color)
+        mirrored = pygame.transform.flip(image, True, False)
+        # In a real game, you'd load actual sprite sheets
+        frame_counts = {"idle": 1, "run": 4, "jump": 1, "dash": 1}
+        skin_animations[key] = {
+            state: ([image] * count, [mirrored] * count)
+            for state, count in frame_counts.items()
+        }
+    return skin_animations[key]
 
 class Player(pygame.sprite.Sprite):
     def __init__(self, x, y, player_id=1):
@@ -20,10 +60,13 @@ class Player(pygame.sprite.Sprite):
         self.gravity = PLAYER_GRAVITY
         self.on_ground = False
         
+        # Resolve platform collisions along the whole move (see swept_collision.py)
+        self.swept = SWEPT_COLLISIONS
+        
         # Animation variables
         self.animation_state = "idle"
         self.frame_index = 0
-        self.animation_speed = 0.1
+        self.animation_speed = per_step(0.1)
         self.facing_right = True
         
         # Dash variables
@@ -36,27 +79,27 @@ class Player(pygame.sprite.Sprite):
         # Power-up variables
         self.active_powerups = {}
         
+        # Dash ends and power-up expiries, fired from update() when due
+        self.timers = TimerQueue()
+        
         # Game variables
         self.score = 0
         self.coins = 0
         self.checkpoints = 0
+        self.collisions = 0
+        
+        # Input source; None reads the keyboard
+        self.controls = None
+        
+        # Position before the last physics step, for interpolated drawing
+        self.previous_position = self.rect.topleft
         
     def load_images(self):
-        # In a real game, you'd load actual sprite sheets
-        # For this example, we'll create colored rectangles
-        self.animations = {
-            "idle": [self.create_player_surface()],
-            "run": [self.create_player_surface() for _ in range(4)],
-            "jump": [self.create_player_surface()],
-            "dash": [self.create_player_surface()]
-        }
-    
-    def create_player_surface(self):
-        # Create a simple colored rectangle for the player
-        surface = pygame.Surface((PLAYER_WIDTH, PLAYER_HEIGHT), pygame.SRCALPHA)
+        # Right-facing and mirrored frames come from the shared skin cache
         color = RED if self.player_id == 1 else BLUE
-        pygame.draw.rect(surface, color, (0, 0, PLAYER_WIDTH, PLAYER_HEIGHT), border_radius=10)
-        return surface
+        skin = load_skin_animations(self.skin, color)
+        self.animations = {state: frames for state, (frames, _) in skin.items()}
+        self.flipped_animations = {state: mirrored for state, (_, mirrored) in skin.items()}
     
     def apply_gravity(self):
         self.direction.y += self.gravity
@@ -69,11 +112,12 @@ class Player(pygame.sprite.Sprite):
             self.animation_state = "jump"
     
     def dash(self):
-        current_time = pygame.time.get_ticks()
+        current_time = game_clock.get_ticks()
         if self.can_dash and current_time - self.last_dash >= self.dash_cooldown:
             self.dashing = True
             self.dash_time = current_time
             self.last_dash = current_time
+            self.timers.schedule_at(current_time + 200, self.end_dash)  # Dash lasts 200ms
             
             # Apply dash force in the direction player is facing
             dash_direction = 1 if self.facing_right else -1
@@ -87,13 +131,11 @@ class Player(pygame.sprite.Sprite):
         if self.frame_index >= len(self.animations[self.animation_state]):
             self.frame_index = 0
         
-        image = self.animations[self.animation_state][int(self.frame_index)]
-        
-        # Flip image if facing left
+        # Mirrored frames are precomputed, so facing left is just another lookup
         if self.facing_right:
-            self.image = image
+            self.image = self.animations[self.animation_state][int(self.frame_index)]
         else:
-            self.image = pygame.transform.flip(image, True, False)
+            self.image = self.flipped_animations[self.animation_state][int(self.frame_index)]
     
     def update_animation_state(self):
         if self.dashing:
@@ -106,9 +148,15 @@ class Player(pygame.sprite.Sprite):
             self.animation_state = "idle"
     
     def apply_powerup(self, powerup_type, duration):
+        # Picking up a power-up that is already active restarts its time
+        if powerup_type in self.active_powerups:
+            self.active_powerups[powerup_type]["timer"].cancel()
+        
+        start_time = game_clock.get_ticks()
         self.active_powerups[powerup_type] = {
-            "start_time": pygame.time.get_ticks(),
-            "duration": duration
+            "start_time": start_time,
+            "duration": duration,
+            "timer": self.timers.schedule_at(start_time + duration, self.expire_powerup, powerup_type)
         }
         
         # Apply power-up effects
@@ -117,25 +165,20 @@ class Player(pygame.sprite.Sprite):
         elif powerup_type == "high_jump":
             self.jump_power = PLAYER_JUMP_POWER * HIGH_JUMP_MULTIPLIER
     
-    def update_powerups(self):
-        current_time = pygame.time.get_ticks()
-        expired_powerups = []
-        
-        for powerup_type, data in self.active_powerups.items():
-            if current_time - data["start_time"] >= data["duration"]:
-                expired_powerups.append(powerup_type)
+    def expire_powerup(self, powerup_type):
+        # Remove the power-up and reset its effects
+        del self.active_powerups[powerup_type]
         
-        # Remove expired power-ups and reset their effects
-        for powerup_type in expired_powerups:
-            del self.active_powerups[powerup_type]
-            
-            if powerup_type == "speed_boost":
-                self.speed = PLAYER_SPEED
-            elif powerup_type == "high_jump":
-                self.jump_power = PLAYER_JUMP_POWER
+        if powerup_type == "speed_boost":
+            self.speed = PLAYER_SPEED
+        elif powerup_type == "high_jump":
+            self.jump_power = PLAYER_JUMP_POWER
     
     def get_input(self):
-        keys = pygame.key.get_pressed()
+        if self.controls is not None:
+            keys = self.controls.get_pressed()
+        else:
+            keys = pygame.key.get_pressed()
         
         # Player 1 controls
         if self.player_id == 1:
@@ -171,44 +214,82 @@ class Player(pygame.sprite.Sprite):
             if keys[pygame.K_RSHIFT]:
                 self.dash()
     
-    def update_dash_state(self):
-        current_time = pygame.time.get_ticks()
-        
-        if self.dashing and current_time - self.dash_time >= 200:  # Dash lasts 200ms
-            self.dashing = False
-            self.direction.x = 0
+    def end_dash(self):
+        self.dashing = False
+        self.direction.x = 0
     
-    def update(self, platforms):
-        self.get_input()
-        self.update_dash_state()
-        self.update_powerups()
-        
+    def move_discrete(self, platforms):
         # Move horizontally
         self.rect.x += self.direction.x
         
         # Check for collisions with platforms
         self.on_ground = False
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                # Horizontal collision
-                if self.direction.x > 0:  # Moving right
-                    self.rect.right = platform.rect.left
-                elif self.direction.x < 0:  # Moving left
-                    self.rect.left = platform.rect.right
+        for platform in colliding_platforms(self.rect, platforms):
+            # Horizontal collision
+            if self.direction.x > 0:  # Moving right
+                self.rect.right = platform.rect.left
+            elif self.direction.x < 0:  # Moving left
+                self.rect.left = platform.rect.right
         
         # Apply gravity and check for vertical collisions
         self.apply_gravity()
         
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                # Vertical collision
-                if self.direction.y > 0:  # Falling
-                    self.rect.bottom = platform.rect.top
-                    self.direction.y = 0
-                    self.on_ground = True
-                elif self.direction.y < 0:  # Jumping
-                    self.rect.top = platform.rect.bottom
-                    self.direction.y = 0
+        for platform in colliding_platforms(self.rect, platforms):
+            # Vertical collision
+            if self.direction.y > 0:  # Falling
+                self.rect.bottom = platform.rect.top
+                self.direction.y = 0
+                self.on_ground = True
+            elif self.direction.y < 0:  # Jumping
+                self.rect.top = platform.rect.bottom
+                self.direction.y = 0
+    
+    def move_swept(self, platforms):
+        # Same moves and responses as move_discrete, but platforms crossed
+        # on the way stop the player too, so it cannot tunnel through them
+        start = self.rect.copy()
+        self.rect.x += self.direction.x
+        self.on_ground = False
+        edge = sweep(start, self.rect, self.direction.x, platforms, horizontal=True)
+        if edge is not None:
+            if self.direction.x > 0:  # Moving right
+                self.rect.right = edge
+            else:  # Moving left
+                self.rect.left = edge
+        
+        start = self.rect.copy()
+        self.apply_gravity()
+        edge = sweep(start, self.rect, self.direction.y, platforms, horizontal=False)
+        if edge is not None:
+            if self.direction.y > 0:  # Falling
+                self.rect.bottom = edge
+                self.on_ground = True
+            else:  # Jumping
+                self.rect.top = edge
+            self.direction.y = 0
+    
+    def swept_rect(self):
+        # Everything the player covered during its last update
+        return self.rect.union(pygame.Rect(self.previous_position, self.rect.size))
+    
+    def interpolated_position(self, interpolation):
+        if interpolation >= 1.0:
+            return self.rect.topleft
+        previous_x, previous_y = self.previous_position
+        return (round(previous_x + (self.rect.x - previous_x) * interpolation),
+                round(previous_y + (self.rect.y - previous_y) * interpolation))
+    
+    def update(self, platforms):
+        self.previous_position = self.rect.topleft
+        self.get_input()
+        # Timers fire after input, so a dash ending this step stops the
+        # player and an expiring power-up still applied to this step's input
+        self.timers.run()
+        
+        if self.swept:
+            self.move_swept(platforms)
+        else:
+            self.move_discrete(platforms)
         
         # Keep player within screen bounds
         if self.rect.left < 0:
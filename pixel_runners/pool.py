@@ -0,0 +1,54 @@
+import pygame
+from settings import *
+
+class SpritePool:
+    # Free list of one sprite type. Sprites are handed back when they leave
+    # their group (scrolled off, collected or broken) and acquire() resets a
+    # free one in place of building a new sprite, image lookup and Rect.
+    # At most `limit` sprites are kept; extra ones are left to the GC.
+    def __init__(self, factory, limit=256):
+        self.factory = factory
+        self.limit = limit
+        self.free = []
+        self.hits = 0
+        self.misses = 0
+        self.released = 0
+        self.dropped = 0
+
+    def acquire(self, *args):
+        if self.free:
+            self.hits += 1
+            sprite = self.free.pop()
+            sprite.reset(*args)
+            return sprite
+        self.misses += 1
+        return self.factory(*args)
+
+    def release(self, sprite):
+        if len(self.free) < self.limit:
+            self.released += 1
+            self.free.append(sprite)
+        else:
+            self.dropped += 1
+
+    def clear(self):
+        self.free.clear()
+
+    def stats(self):
+        acquired = self.hits + self.misses
+        return {
+            "free": len(self.free),
+            "hits": self.hits,
+            "misses": self.misses,
+            "released": self.released,
+            "dropped": self.dropped,
+            "hit_rate": self.hits / acquired if acquired else 0.0
+        }
+
+def place(sprite, x, y):
+    # Fit the sprite's Rect to its image at (x, y), reusing the Rect when
+    # the sprite already has one
+    if getattr(sprite, "rect", None) is None:
+        sprite.rect = sprite.image.get_rect(topleft=(x, y))
+    else:
+        sprite.rect.update((x, y), sprite.image.get_size())
@@ -1,16 +1,25 @@
 import pygame
 from settings import *
+from surface_cache import surface_cache
+from pool import place
 
 class PowerUp(pygame.sprite.Sprite):
     def __init__(self, x, y, powerup_type="speed_boost"):
         super().__init__()
+        self.reset(x, y, powerup_type)
+    
+    def reset(self, x, y, powerup_type="speed_boost"):
         self.powerup_type = powerup_type
         self.image = self.create_powerup_surface()
-        self.rect = self.image.get_rect(topleft=(x, y))
+        place(self, x, y)
         self.speed = SCROLL_SPEED
+        self.motion = "scroll"
         self.duration = POWERUP_DURATION
         
     def create_powerup_surface(self):
+        return surface_cache.get("powerup", (30, 30), self.powerup_type, self.draw_powerup_surface)
+    
+    def draw_powerup_surface(self):
         surface = pygame.Surface((30, 30), pygame.SRCALPHA)
         
         if self.powerup_type == "speed_boost":
@@ -0,0 +1,155 @@
+import json
+import time
+import numpy as np
+import pygame
+from settings import *
+from text_cache import render_text
+from fonts import get_font
+
+# Frames kept in the ring buffer (10 seconds at 60 FPS)
+PROFILER_FRAMES = 600
+
+# Phases a frame is split into, in the order they normally run
+PHASES = ("events", "players", "level", "generate", "draw_level", "draw_hud", "overlay", "flip")
+PHASE_INDEX = {phase: i for i, phase in enumerate(PHASES)}
+
+# Sprite groups whose sizes are recorded with each frame
+GROUPS = ("platforms", "obstacles", "powerups", "coins", "checkpoints")
+
+class FrameProfiler:
+    # Per-phase frame timings in a fixed-size ring buffer. Game code calls
+    # mark(phase) after each phase; the time since the previous mark is
+    # charged to that phase, so a phase that runs several times a frame
+    # (physics catch-up steps) accumulates. While disabled every call returns
+    # straight away.
+    def __init__(self, capacity=PROFILER_FRAMES):
+        self.enabled = False
+        self.capacity = capacity
+        self.phase_ms = np.zeros((capacity, len(PHASES)), dtype=np.float32)
+        self.frame_ms = np.zeros(capacity, dtype=np.float32)
+        self.counts = np.zeros((capacity, len(GROUPS)), dtype=np.int32)
+        self.index = 0
+        self.filled = 0
+        self.frames = 0  # every frame profiled so far; unlike filled, never capped
+        self.frame_start = 0.0
+        self.last_mark = 0.0
+
+        # Overlay text is refreshed a few times a second, not every frame
+        self.summary_lines = []
+        self.summary_frame = 0
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            self.frame_start = self.last_mark = time.perf_counter()
+            self.phase_ms[self.index] = 0
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        self.frame_start = self.last_mark = time.perf_counter()
+        self.phase_ms[self.index] = 0
+
+    def mark(self, phase):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        self.phase_ms[self.index, PHASE_INDEX[phase]] += (now - self.last_mark) * 1000
+        self.last_mark = now
+
+    def end_frame(self, level=None):
+        if not self.enabled:
+            return
+        self.frame_ms[self.index] = (time.perf_counter() - self.frame_start) * 1000
+        if level is not None:
+            self.counts[self.index] = [len(getattr(level, group)) for group in GROUPS]
+        else:
+            self.counts[self.index] = 0
+        self.index = (self.index + 1) % self.capacity
+        self.filled = min(self.filled + 1, self.capacity)
+        self.frames += 1
+
+    def ordered(self, array):
+        # Recorded rows, oldest first
+        if self.filled < self.capacity:
+            return array[:self.filled]
+        return np.roll(array, -self.index, axis=0)
+
+    def percentiles(self, values=(50, 95, 99)):
+        if not self.filled:
+            return [0.0 for _ in values]
+        return np.percentile(self.frame_ms[:self.filled], values).tolist()
+
+    def summary(self):
+        p50, p95, p99 = self.percentiles()
+        phases = self.phase_ms[:self.filled].mean(axis=0) if self.filled else np.zeros(len(PHASES))
+        latest = self.counts[(self.index - 1) % self.capacity]
+        return {
+            "frames": self.filled,
+            "frame_ms": {"p50": p50, "p95": p95, "p99": p99},
+            "phase_mean_ms": dict(zip(PHASES, phases.tolist())),
+            "sprites": dict(zip(GROUPS, latest.tolist())),
+        }
+
+    def export_csv(self, path):
+        import csv
+        with open(path, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(("frame", "frame_ms") + PHASES + GROUPS)
+            rows = zip(self.ordered(self.frame_ms).tolist(), self.ordered(self.phase_ms).tolist(),
+                       self.ordered(self.counts).tolist())
+            for i, (frame, phases, counts) in enumerate(rows):
+                writer.writerow([i, round(frame, 3)] + [round(value, 3) for value in phases] + counts)
+
+    def export_json(self, path):
+        data = {
+            "phases": list(PHASES),
+            "groups": list(GROUPS),
+            "summary": self.summary(),
+            "frame_ms": self.ordered(self.frame_ms).tolist(),
+            "phase_ms": self.ordered(self.phase_ms).tolist(),
+            "counts": self.ordered(self.counts).tolist(),
+        }
+        with open(path, 'w') as file:
+            json.dump(data, file)
+
+    def export(self, path=PROFILER_EXPORT_PATH):
+        try:
+            self.export_csv(path + ".csv")
+            self.export_json(path + ".json")
+            print(f"Wrote {self.filled} profiled frames to {path}.csv and {path}.json")
+        except Exception as e:
+            print(f"Error exporting profile: {e}")
+
+    def draw(self, screen):
+        if not self.enabled:
+            return
+        font = get_font(16)
+        if not self.summary_lines or self.frames - self.summary_frame >= 20:
+            self.summary_frame = self.frames
+            summary = self.summary()
+            frame = summary["frame_ms"]
+            self.summary_lines = [f"frame p50 {frame['p50']:.2f}  p95 {frame['p95']:.2f}  p99 {frame['p99']:.2f} ms"]
+            self.summary_lines += [f"{phase:<10} {ms:.2f} ms" for phase, ms in summary["phase_mean_ms"].items()]
+            self.summary_lines.append("  ".join(f"{group} {count}" for group, count in summary["sprites"].items()))
+
+        # Panel in the bottom right corner
+        width, height = 420, 310
+        left, top = SCREEN_WIDTH - width - 10, SCREEN_HEIGHT - height - 10
+        pygame.draw.rect(screen, BLACK, (left, top, width, height))
+        pygame.draw.rect(screen, WHITE, (left, top, width, height), width=1)
+        for i, line in enumerate(self.summary_lines):
+            screen.blit(render_text(font, line, WHITE), (left + 10, top + 8 + i * 18))
+
+        # Rolling frame time graph, with a line at the frame budget
+        graph = pygame.Rect(left + 10, top + height - 110, width - 20, 100)
+        scale = graph.height / (2000 / FPS)
+        budget_y = graph.bottom - int(1000 / FPS * scale)
+        pygame.draw.line(screen, GREEN, (graph.left, budget_y), (graph.right, budget_y))
+        samples = self.ordered(self.frame_ms)[-graph.width:]
+        if len(samples) > 1:
+            ys = np.maximum(graph.bottom - samples * scale, graph.top).astype(np.int32)
+            xs = np.arange(graph.right - len(samples), graph.right, dtype=np.int32)
+            pygame.draw.lines(screen, YELLOW, False, list(zip(xs.tolist(), ys.tolist())))
+
+frame_profiler = FrameProfiler()
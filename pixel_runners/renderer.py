@@ -0,0 +1,132 @@
+import pygame
+from settings import *
+
+class DirtyRenderer:
+    # Presents a frame by pushing only the screen regions that changed.
+    #
+    # While playing, the regions are the old and new rects of every sprite,
+    # the HUD panels and the parts of the parallax background that moved.
+    # The background under those regions is repainted, the sprites are drawn
+    # on top and pygame.display.update(rects) pushes them. When the dirty
+    # area passes the threshold a normal full redraw and flip is cheaper.
+    # Menu-like screens are only redrawn when what they show changes.
+    def __init__(self, screen, threshold=DIRTY_RECT_THRESHOLD):
+        self.screen = screen
+        self.threshold = threshold
+        self.screen_area = SCREEN_WIDTH * SCREEN_HEIGHT
+        self.previous_rects = []
+        self.last_signature = None
+
+        # Frame counters, also used by compare_render_paths()
+        self.full_frames = 0
+        self.dirty_frames = 0
+        self.skipped_frames = 0
+        self.dirty_area = 0
+
+    def invalidate(self):
+        # Force the next frame to be a full redraw
+        self.last_signature = None
+
+    def present(self, game):
+        if game.game_state == "playing":
+            self.present_playing(game)
+        else:
+            self.present_static(game)
+
+    def present_full(self, game):
+        game.draw_frame()
+        pygame.display.flip()
+        self.full_frames += 1
+
+    def present_static(self, game):
+        signature = (game.game_state, game.selected_level, game.selected_option, game.multiplayer,
+                     len(game.leaderboard.scores), tuple(player.score for player in game.players),
+                     len(game.run_ranks))
+        if signature == self.last_signature:
+            self.skipped_frames += 1
+            return
+
+        self.last_signature = signature
+        self.previous_rects = []
+        self.present_full(game)
+
+    def present_playing(self, game):
+        level = game.level
+        drawn = level.visible_rects()
+        drawn.extend(player.rect.clip(self.screen.get_rect()) for player in game.players)
+        drawn.extend(game.ui.hud_rects(game.players))
+
+        full = self.last_signature != "playing"
+        self.last_signature = "playing"
+
+        if not full:
+            dirty = self.previous_rects + drawn + level.background_dirty_rects()
+            area = sum(rect.width * rect.height for rect in dirty)
+            full = area > self.threshold * self.screen_area
+
+        self.previous_rects = drawn
+        if full:
+            self.present_full(game)
+            return
+
+        # Repaint the background under the dirty regions, then everything on top
+        level.draw_background(self.screen, dirty)
+        level.draw_sprites(self.screen)
+        for player in game.players:
+            self.screen.blit(player.image, player.rect)
+        game.ui.draw_player_stats(self.screen, game.players)
+
+        pygame.display.update(dirty)
+        self.dirty_frames += 1
+        self.dirty_area += area
+
+def compare_render_paths(frames=600, level_index=0, seed=0):
+    # Frame-time comparison of the full flip path against the dirty-rect path
+    # on the same scripted run. Only drawing is timed.
+    import os
+    import random
+    import time
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import game_clock
+    from controls import ScriptedControls
+    from game import Game
+
+    clock = game_clock.SimulatedClock()
+    previous_clock = game_clock.set_clock(clock)
+    results = {}
+    try:
+        for mode in ("flip", "dirty"):
+            random.seed(seed)
+            clock.ticks = 0
+            game = Game()
+            game.selected_level = level_index
+            game.start_game()
+            for player in game.players:
+                player.controls = ScriptedControls()
+            renderer = DirtyRenderer(game.screen) if mode == "dirty" else None
+            game.renderer = renderer
+
+            draw_time = 0.0
+            drawn = 0
+            while drawn < frames and game.game_state == "playing":
+                game.update()
+                clock.advance()
+                start = time.perf_counter()
+                game.draw()
+                draw_time += time.perf_counter() - start
+                drawn += 1
+
+            result = {"frames": drawn, "ms_per_frame": 1000 * draw_time / drawn if drawn else 0.0}
+            if renderer is not None:
+                result["full_frames"] = renderer.full_frames
+                result["dirty_frames"] = renderer.dirty_frames
+                result["mean_dirty_fraction"] = (renderer.dirty_area / renderer.dirty_frames / renderer.screen_area
+                                                 if renderer.dirty_frames else 1.0)
+            results[mode] = result
+    finally:
+        game_clock.set_clock(previous_clock)
+    return results
+
+if __name__ == "__main__":
+    for mode, result in compare_render_paths().items():
+        print(mode, result)
@@ -0,0 +1,233 @@
+import json
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+import pygame
+from settings import *
+import game_clock
+from controls import KeyState, ScriptedControls
+
+# Replay file layout (little endian):
+#   header      MAGIC, version, metadata length
+#   metadata    UTF-8 JSON: level, seed, clock start, tick count and the
+#               final player results the replay must reproduce
+#   inputs      zlib-compressed key masks, one byte per player per tick,
+#               tick-major (player 1 then player 2 for each tick)
+MAGIC = b"PRRP"
+VERSION = 1
+HEADER = struct.Struct("<4sHxxI")
+
+# The keys Player.get_input reads, in mask bit order: left, right, jump, dash
+PLAYER_KEYS = {
+    1: (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_LSHIFT),
+    2: (pygame.K_LEFT, pygame.K_RIGHT, pygame.K_UP, pygame.K_RSHIFT),
+}
+
+def encode_keys(keys, player_id):
+    mask = 0
+    for bit, key in enumerate(PLAYER_KEYS[player_id]):
+        if keys[key]:
+            mask |= 1 << bit
+    return mask
+
+def decode_mask(mask, player_id):
+    return KeyState(key for bit, key in enumerate(PLAYER_KEYS[player_id]) if mask & (1 << bit))
+
+def player_results(players):
+    return [
+        {
+            "player_id": player.player_id,
+            "score": player.score,
+            "coins": player.coins,
+            "checkpoints": player.checkpoints,
+            "x": player.rect.x,
+            "y": player.rect.y
+        }
+        for player in players
+    ]
+
+class RecordingControls:
+    # Passes a player's input through (the keyboard unless another controls
+    # object is given) and keeps one key mask per tick
+    def __init__(self, player_id, source=None):
+        self.player_id = player_id
+        self.source = source
+        self.masks = bytearray()
+
+    def get_pressed(self):
+        keys = self.source.get_pressed() if self.source is not None else pygame.key.get_pressed()
+        self.masks.append(encode_keys(keys, self.player_id))
+        return keys
+
+class Replay:
+    def __init__(self, level_index, seed, multiplayer, clock_ticks, tick_ms, masks, results=None):
+        self.level_index = level_index
+        self.seed = seed
+        self.multiplayer = multiplayer
+        self.clock_ticks = clock_ticks  # simulated clock value when the run started
+        self.tick_ms = tick_ms
+        self.masks = masks  # one bytes object per player
+        self.results = results or []
+
+    @property
+    def ticks(self):
+        return min(len(masks) for masks in self.masks) if self.masks else 0
+
+    @classmethod
+    def from_game(cls, game, recorders, clock_ticks):
+        clock = game_clock.get_clock()
+        return cls(game.selected_level, game.level.seed, game.multiplayer, clock_ticks,
+                   getattr(clock, "tick_ms", 1000 / PHYSICS_TICK_RATE),
+                   [bytes(recorder.masks) for recorder in recorders], player_results(game.players))
+
+    def save(self, path):
+        ticks = self.ticks
+        metadata = json.dumps({
+            "level": self.level_index,
+            "level_name": LEVELS[self.level_index]["name"],
+            "seed": self.seed,
+            "multiplayer": self.multiplayer,
+            "clock_ticks": self.clock_ticks,
+            "tick_ms": self.tick_ms,
+            "ticks": ticks,
+            "results": self.results
+        }).encode("utf-8")
+        interleaved = bytes(masks[tick] for tick in range(ticks) for masks in self.masks)
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, len(metadata)))
+            file.write(metadata)
+            file.write(zlib.compress(interleaved, 9))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            magic, version, metadata_length = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a replay (version {VERSION})")
+            metadata = json.loads(file.read(metadata_length).decode("utf-8"))
+            interleaved = zlib.decompress(file.read())
+
+        players = 2 if metadata["multiplayer"] else 1
+        masks = [interleaved[i::players] for i in range(players)]
+        return cls(metadata["level"], metadata["seed"], metadata["multiplayer"], metadata["clock_ticks"],
+                   metadata["tick_ms"], masks, metadata["results"])
+
+    def controls(self):
+        # One ScriptedControls per player feeding the recorded masks back
+        controls = []
+        for i, masks in enumerate(self.masks):
+            states = [decode_mask(mask, i + 1) for mask in range(1 << len(PLAYER_KEYS[i + 1]))]
+            controls.append(ScriptedControls(
+                lambda tick, masks=masks, states=states: states[masks[tick]] if tick < len(masks) else states[0]
+            ))
+        return controls
+
+    def make_clock(self):
+        clock = game_clock.SimulatedClock(self.tick_ms)
+        clock.ticks = self.clock_ticks
+        return clock
+
+    def mismatches(self, results):
+        # Fields of the final player state that differ from the recording
+        found = []
+        for expected, actual in zip(self.results, results):
+            for field, value in expected.items():
+                if actual.get(field) != value:
+                    found.append(f"player {expected['player_id']} {field}: recorded {value}, replayed {actual.get(field)}")
+        if len(self.results) != len(results):
+            found.append(f"recorded {len(self.results)} players, replayed {len(results)}")
+        return found
+
+def save_replay(game, recorders, clock_ticks):
+    # Called by Game when a recorded run ends
+    try:
+        os.makedirs(REPLAY_DIR, exist_ok=True)
+        path = os.path.join(REPLAY_DIR, time.strftime("replay_%Y%m%d_%H%M%S.prr"))
+        Replay.from_game(game, recorders, clock_ticks).save(path)
+        return path
+    except Exception as e:
+        print(f"Error saving replay: {e}")
+        return None
+
+def play_headless(replay):
+    # Steps the recorded ticks as fast as possible with no window
+    from headless import HeadlessRunner
+    runner = HeadlessRunner(replay.level_index, replay.multiplayer, replay.controls(), replay.seed,
+                            clock=replay.make_clock())
+    result = runner.run(replay.ticks)
+    runner.close()
+    return result
+
+def play_rendered(replay, fast=False):
+    # Shows the replay in a window, at recorded speed or as fast as it draws
+    from game import Game
+    random.seed(replay.seed)
+    clock = replay.make_clock()
+    previous_clock = game_clock.set_clock(clock)
+
+    game = Game()
+    game.record_replays = False
+    game.selected_level = replay.level_index
+    game.multiplayer = replay.multiplayer
+    game.level_seed = replay.seed
+    game.start_game()
+    for player, controls in zip(game.players, replay.controls()):
+        player.controls = controls
+
+    start = time.perf_counter()
+    ticks = 0
+    try:
+        while ticks < replay.ticks and game.game_state == "playing":
+            if any(event.type == pygame.QUIT for event in pygame.event.get()):
+                break
+            game.update()
+            clock.advance()
+            ticks += 1
+            game.draw()
+            if not fast:
+                game.clock.tick(1000 / replay.tick_ms)
+    finally:
+        game.level.close()
+        game.leaderboard.close()
+        game_clock.set_clock(previous_clock)
+
+    elapsed = time.perf_counter() - start
+    return {"ticks": ticks, "elapsed": elapsed, "ticks_per_sec": ticks / elapsed if elapsed > 0 else 0.0,
+            "players": player_results(game.players)}
+
+def main():
+    import argparse  # command line only; the game imports this module too
+    parser = argparse.ArgumentParser(description="Play back Pixel Runners replays")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    play_parser = subparsers.add_parser("play", help="replay a run and check it ends the same way")
+    play_parser.add_argument("path")
+    play_parser.add_argument("--headless", action="store_true", help="no window, as fast as possible")
+    play_parser.add_argument("--fast", action="store_true", help="rendered, but not held to the tick rate")
+
+    info_parser = subparsers.add_parser("info", help="describe a replay")
+    info_parser.add_argument("path")
+
+    args = parser.parse_args()
+    replay = Replay.load(args.path)
+    print(f"{LEVELS[replay.level_index]['name']} (seed {replay.seed}): {replay.ticks} ticks, "
+          f"{len(replay.masks)} player(s)")
+    if args.command == "info":
+        for expected in replay.results:
+            print(f"  Player {expected['player_id']}: score {expected['score']} at ({expected['x']}, {expected['y']})")
+        return
+
+    result = play_headless(replay) if args.headless else play_rendered(replay, args.fast)
+    print(f"Replayed {result['ticks']} ticks in {result['elapsed']:.3f}s ({result['ticks_per_sec']:.0f} ticks/sec)")
+    mismatches = replay.mismatches(result["players"])
+    for mismatch in mismatches:
+        print(f"  MISMATCH {mismatch}")
+    print("Replay matches the recording" if not mismatches else "Replay diverged from the recording")
+    pygame.quit()
+    sys.exit(1 if mismatches else 0)
+
+if __name__ == "__main__":
+    main()
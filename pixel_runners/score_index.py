@@ -0,0 +1,182 @@
+from bisect import bisect_left, bisect_right
+
+class SortedScores:
+    # Ordered multiset of (key, record) pairs kept as a list of sorted
+    # buckets, with a Fenwick tree over the bucket sizes. Inserts and rank
+    # lookups are a bisect over the bucket maxima, a bisect inside one bucket
+    # and an O(log buckets) tree walk; buckets split at 2 * LOAD entries.
+    LOAD = 512
+
+    def __init__(self):
+        self.keys = []  # one sorted key list per bucket
+        self.records = []  # records, parallel to keys
+        self.maxes = []  # last key of each bucket
+        self.tree = []
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def build_tree(self):
+        tree = [0] + [len(keys) for keys in self.keys]
+        for i in range(1, len(tree)):
+            parent = i + (i & -i)
+            if parent < len(tree):
+                tree[parent] += tree[i]
+        self.tree = tree
+
+    def tree_add(self, bucket, delta):
+        i = bucket + 1
+        while i < len(self.tree):
+            self.tree[i] += delta
+            i += i & -i
+
+    def tree_prefix(self, bucket):
+        # Number of entries in buckets before `bucket`
+        total = 0
+        i = bucket
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def bulk_load(self, keys, records):
+        # Replaces the contents with already sorted, parallel keys and records
+        self.keys = [keys[i:i + self.LOAD] for i in range(0, len(keys), self.LOAD)]
+        self.records = [records[i:i + self.LOAD] for i in range(0, len(records), self.LOAD)]
+        self.maxes = [bucket[-1] for bucket in self.keys]
+        self.size = len(keys)
+        self.build_tree()
+
+    def insert(self, key, record):
+        if not self.keys:
+            self.keys.append([key])
+            self.records.append([record])
+            self.maxes.append(key)
+            self.size = 1
+            self.build_tree()
+            return
+
+        bucket = bisect_left(self.maxes, key)
+        if bucket == len(self.maxes):
+            bucket -= 1
+        keys = self.keys[bucket]
+        position = bisect_right(keys, key)
+        keys.insert(position, key)
+        self.records[bucket].insert(position, record)
+        self.maxes[bucket] = keys[-1]
+        self.size += 1
+
+        if len(keys) > 2 * self.LOAD:
+            self.keys[bucket:bucket + 1] = [keys[:self.LOAD], keys[self.LOAD:]]
+            records = self.records[bucket]
+            self.records[bucket:bucket + 1] = [records[:self.LOAD], records[self.LOAD:]]
+            self.maxes[bucket:bucket + 1] = [self.keys[bucket][-1], self.keys[bucket + 1][-1]]
+            self.build_tree()
+        else:
+            self.tree_add(bucket, 1)
+
+    def count_before(self, key):
+        # Number of entries whose key is less than `key`
+        bucket = bisect_left(self.maxes, key)
+        if bucket == len(self.maxes):
+            return self.size
+        return self.tree_prefix(bucket) + bisect_left(self.keys[bucket], key)
+
+    def record_at(self, index):
+        # Fenwick descent to the bucket holding the index-th entry
+        bucket = 0
+        step = 1
+        while step * 2 < len(self.tree):
+            step *= 2
+        remaining = index
+        while step:
+            following = bucket + step
+            if following < len(self.tree) and self.tree[following] <= remaining:
+                bucket = following
+                remaining -= self.tree[following]
+            step //= 2
+        return self.records[bucket][remaining]
+
+    def first(self, count):
+        result = []
+        for records in self.records:
+            if len(result) >= count:
+                break
+            result.extend(records[:count - len(result)])
+        return result
+
+class ScoreHistory:
+    # Every recorded run, indexed globally, per level and per player.
+    # Keys are (-score, sequence) so the best score sorts first and ties keep
+    # the order the runs were recorded in.
+    def __init__(self, records=()):
+        self.next_sequence = 0
+        self.all = SortedScores()
+        self.levels = {}
+        self.players = {}
+        self.load(records)
+
+    def __len__(self):
+        return len(self.all)
+
+    def load(self, records):
+        # Sort once, then split into per-level and per-player runs, which
+        # come out already in order
+        records = list(records)
+        start = self.next_sequence
+        self.next_sequence += len(records)
+        keys = [(-record["score"], start + i) for i, record in enumerate(records)]
+        order = sorted(range(len(records)), key=keys.__getitem__)
+        keys = [keys[i] for i in order]
+        records = [records[i] for i in order]
+        self.all.bulk_load(keys, records)
+
+        for field, indexes in (("level", self.levels), ("player_name", self.players)):
+            grouped = {}
+            for key, record in zip(keys, records):
+                group = grouped.get(record[field])
+                if group is None:
+                    group = grouped[record[field]] = ([], [])
+                group[0].append(key)
+                group[1].append(record)
+            for name, (group_keys, group_records) in grouped.items():
+                indexes[name] = SortedScores()
+                indexes[name].bulk_load(group_keys, group_records)
+
+    def index(self, level=None, player=None):
+        if player is not None:
+            return self.players.get(player, SortedScores())
+        if level is not None:
+            return self.levels.get(level, SortedScores())
+        return self.all
+
+    def add(self, record):
+        key = (-record["score"], self.next_sequence)
+        self.next_sequence += 1
+        self.all.insert(key, record)
+        self.levels.setdefault(record["level"], SortedScores()).insert(key, record)
+        self.players.setdefault(record["player_name"], SortedScores()).insert(key, record)
+
+    def rank(self, score, level=None):
+        # Position a run with this score takes: 1 + runs that scored higher
+        return self.index(level).count_before((-score, -1)) + 1
+
+    def top(self, count, level=None, player=None):
+        return self.index(level, player).first(count)
+
+    def percentile(self, score, level=None):
+        # Percentage of recorded runs that scored lower than `score`
+        index = self.index(level)
+        if not len(index):
+            return 100.0
+        at_least = index.count_before((-score, float("inf")))
+        return 100.0 * (len(index) - at_least) / len(index)
+
+    def score_at_percentile(self, percent, level=None):
+        # Lowest score that still beats `percent` percent of recorded runs
+        index = self.index(level)
+        if not len(index):
+            return None
+        position = min(len(index) - 1, int(len(index) * (100.0 - percent) / 100.0))
+        return index.record_at(position)["score"]
@@ -8,6 +8,24 @@ SCREEN_HEIGHT = 720
 FPS = 60
 TITLE = "Pixel Runners"
 
+# Timing settings
+PHYSICS_TICK_RATE = 60  # simulation steps per second
+MAX_CATCHUP_STEPS = 5  # physics steps per rendered frame before the backlog is dropped
+RENDER_FPS = FPS  # frame rate cap for drawing, 0 for uncapped
+# Resolve player collisions along the whole move, not just where it ends.
+# This does not allow a coarser headless tick (e.g. 30 Hz): that was left
+# out, as movement constants are per step and would need rescaling.
+SWEPT_COLLISIONS = False
+
+def per_step(value, order=1):
+    # Speeds, gravity and jumps are tuned as amounts per step at 60 steps
+    # per second; this converts one to PHYSICS_TICK_RATE so the game plays
+    # at the same speed (order 2 for accelerations). Rates that divide 60
+    # keep whole-pixel speeds exact; above 60, speeds become fractional and
+    # entity rects round every move, so scrolling is only approximate.
+    scaled = value * (60 / PHYSICS_TICK_RATE) ** order
+    return int(scaled) if scaled == int(scaled) else scaled
+
 # Colors
 WHITE = (255, 255, 255)
 BLACK = (0, 0, 0)
@@ -18,18 +36,26 @@ YELLOW = (255, 255, 0)
 PURPLE = (128, 0, 128)
 
 # Player settings
-PLAYER_SPEED = 10
-PLAYER_JUMP_POWER = 30
-PLAYER_GRAVITY = 0.8
+PLAYER_SPEED = per_step(10)
+PLAYER_JUMP_POWER = per_step(30)
+PLAYER_GRAVITY = per_step(0.8, 2)
 PLAYER_WIDTH = 50
 PLAYER_HEIGHT = 80
-PLAYER_DASH_POWER = 10
+PLAYER_DASH_POWER = per_step(10)
 PLAYER_DASH_COOLDOWN = 1000  # milliseconds
 
+# Rendering settings
+DIRTY_RECT_RENDERING = False  # push only changed screen regions instead of flipping
+DIRTY_RECT_THRESHOLD = 0.5  # fraction of the screen above which a full flip is cheaper
+STATIC_STRIPS = False  # draw each chunk's platforms, coins and checkpoints from one composited strip
+
 # Level settings
 GROUND_HEIGHT = 100
-PLATFORM_SPEED = 2
-SCROLL_SPEED = 3
+PLATFORM_SPEED = per_step(2)
+SCROLL_SPEED = per_step(3)
+CHUNK_QUEUE_SIZE = 4  # level chunks generated ahead of the camera
+SPRITE_POOL_LIMIT = 256  # spare sprites kept per entity type for reuse
+VIEW_WINDOW_MARGIN = 256  # pixels past the right edge where entities spawned ahead wake up
 
 # Power-up settings
 POWERUP_DURATION = 5000  # milliseconds
@@ -37,6 +63,17 @@ SPEED_BOOST_MULTIPLIER = 1.5
 HIGH_JUMP_MULTIPLIER = 1.3
 SLOW_MOTION_FACTOR = 0.5
 
+# Leaderboard settings
+LEADERBOARD_BACKEND = "sqlite"  # "sqlite" (WAL mode) or "jsonl" (append-only)
+LEADERBOARD_PATH = "leaderboard"  # file name without extension
+
+# Profiler settings (F3 toggles the overlay, F4 exports the recorded frames)
+PROFILER_EXPORT_PATH = "profile"  # file name without extension
+
+# Replay settings
+RECORD_REPLAYS = True  # save every run's input for replay.py
+REPLAY_DIR = "replays"
+
 # Asset paths
 ASSET_DIR = os.path.join(os.path.dirname(__file__), "assets")
 IMAGE_DIR = os.path.join(ASSET_DIR, "images")
@@ -51,6 +88,8 @@ CHARACTER_SKINS = {
 }
 
 # Level configurations
+# An entry may also set "compiled" to the path of a course written by
+# level_format.py; the level is then read from that file instead of generated
 LEVELS = [
     {
         "name": "Green Hills",
@@ -0,0 +1,108 @@
+import pygame
+from settings import *
+from entity_store import EntityGroup
+
+# Width in pixels of one grid column. A platform is 100-300 px wide and a
+# player 50 px, so a query usually touches one or two columns.
+CELL_WIDTH = 256
+
+class PlatformGroup(EntityGroup):
+    # Sprite group that keeps a uniform grid of x columns over its platforms.
+    #
+    # Columns are stored in world coordinates (screen x + scrolled distance),
+    # so the normal scroll of every platform by the same speed never moves a
+    # platform between columns. Only spawns and kills touch the grid.
+    # Platforms that do not scroll at the group speed are kept in a small
+    # "unindexed" set and returned by every query. So is everything when the
+    # speed is fractional (tick rates above 60): rounded moves drift off
+    # the grid.
+    def __init__(self, scroll_speed, *sprites, pool=None):
+        self.scroll_speed = scroll_speed
+        self.indexed = scroll_speed == int(scroll_speed)
+        self.offset = 0
+        self.columns = {}
+        self.sprite_columns = {}
+        self.unindexed = set()
+        self.order = {}
+        self.next_order = 0
+        super().__init__(*sprites, pool=pool)
+
+    def column_range(self, rect):
+        left = (rect.left + self.offset) // CELL_WIDTH
+        right = (max(rect.right - 1, rect.left) + self.offset) // CELL_WIDTH
+        return range(left, right + 1)
+
+    def add_internal(self, sprite, layer=None):
+        super().add_internal(sprite, layer)
+        self.order[sprite] = self.next_order
+        self.next_order += 1
+
+        if not self.indexed or getattr(sprite, "speed", None) != self.scroll_speed:
+            self.unindexed.add(sprite)
+            return
+
+        columns = self.column_range(sprite.rect)
+        for column in columns:
+            self.columns.setdefault(column, set()).add(sprite)
+        self.sprite_columns[sprite] = columns
+
+    def remove_internal(self, sprite):
+        super().remove_internal(sprite)
+        del self.order[sprite]
+
+        if sprite in self.unindexed:
+            self.unindexed.discard(sprite)
+            return
+
+        for column in self.sprite_columns.pop(sprite):
+            bucket = self.columns[column]
+            bucket.discard(sprite)
+            if not bucket:
+                del self.columns[column]
+
+    def update(self, *args, **kwargs):
+        super().update(*args, **kwargs)
+        # Every indexed platform moved left by scroll_speed; shifting the
+        # origin keeps their world columns valid without touching the grid
+        if self.indexed:
+            self.offset += self.scroll_speed
+
+    def query(self, rect, after=None):
+        # Platforms whose columns overlap rect, in group iteration order.
+        # With after set, only platforms whose order number is greater are returned.
+        found = set(self.unindexed)
+        if self.indexed:
+            for column in self.column_range(rect):
+                bucket = self.columns.get(column)
+                if bucket:
+                    found.update(bucket)
+
+        order = self.order
+        if after is not None:
+            return sorted((sprite for sprite in found if order[sprite] > after), key=order.__getitem__)
+        return sorted(found, key=order.__getitem__)
+
+def colliding_platforms(rect, platforms):
+    # Yields the platforms that collide with rect, in the same order and with
+    # the same results as testing every platform in turn. The caller may move
+    # rect between items (collision resolution does); the candidates are then
+    # re-queried for the rest of the group.
+    if not isinstance(platforms, PlatformGroup):
+        for platform in platforms:
+            if rect.colliderect(platform.rect):
+                yield platform
+        return
+
+    queried = rect.copy()
+    candidates = platforms.query(queried)
+    i = 0
+    while i < len(candidates):
+        platform = candidates[i]
+        i += 1
+        if rect.colliderect(platform.rect):
+            position = platforms.order[platform]
+            yield platform
+            if rect != queried:
+                queried = rect.copy()
+                candidates = platforms.query(queried, after=position)
+                i = 0
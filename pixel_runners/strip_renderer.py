@@ -0,0 +1,164 @@
+import pygame
+from settings import *
+from parallax import COLORKEY
+
+# Static geometry strips: the platforms, coins and checkpoints of a chunk
+# all scroll at the same speed, so they never move relative to each other.
+# Each chunk's static sprites are composited once per draw layer and drawn
+# as a handful of tiles, instead of one blit per sprite.
+#
+# Layers match the sprite groups so everything is drawn in the same order
+# as Level.draw_sprites: platforms under obstacles and powerups, then coins,
+# then checkpoints.
+LAYERS = ("platforms", "coins", "checkpoints")
+
+# Width of the tiles a strip is cut into. Tiles are RLE-encoded, which SDL
+# cannot edit in place, so a collected coin rebuilds the tiles it touches;
+# narrow tiles keep that cheap.
+STRIP_TILE_WIDTH = 256
+
+class ChunkStrip:
+    # One layer of one chunk. The strip is placed from its world x and the
+    # platform group's scroll offset, so it needs no per-frame update; the
+    # surfaces are only built the first time the strip is drawn.
+    def __init__(self, renderer, sprites):
+        self.renderer = renderer
+        self.speed = sprites[0].speed
+        bounds = sprites[0].rect.unionall([sprite.rect for sprite in sprites[1:]])
+        self.world_left = bounds.left + renderer.offset()
+        self.top = bounds.top
+        self.size = bounds.size
+        self.source = None
+        self.tiles = []  # (offset within the strip, surface) per column, None where empty
+
+        # Member sprite -> its rect within the strip, in drawing order
+        self.members = {}
+        for sprite in sprites:
+            self.members[sprite] = sprite.rect.move(-bounds.left, -bounds.top)
+            sprite.strip = self
+
+    @property
+    def left(self):
+        return self.world_left - self.renderer.offset()
+
+    @property
+    def right(self):
+        return self.left + self.size[0]
+
+    def composite(self):
+        # Entity graphics are fully opaque or fully transparent, so the strip
+        # is colour-keyed; its RLE tiles skip the empty space, where a
+        # per-pixel alpha strip would blend every pixel it covers
+        self.source = pygame.Surface(self.size)
+        self.source.fill(COLORKEY)
+        self.source.set_colorkey(COLORKEY)
+        self.source.blits([(sprite.image, rect) for sprite, rect in self.members.items()], doreturn=False)
+        columns = (self.size[0] + STRIP_TILE_WIDTH - 1) // STRIP_TILE_WIDTH
+        self.tiles = [self.build_tile(column) for column in range(columns)]
+
+    def build_tile(self, column):
+        # The column of the source trimmed to the members drawn in it
+        area = pygame.Rect(column * STRIP_TILE_WIDTH, 0, STRIP_TILE_WIDTH, self.size[1]).clip(self.source.get_rect())
+        rects = [rect for rect in self.members.values() if rect.colliderect(area)]
+        if not rects:
+            return None
+        bounds = rects[0].unionall(rects[1:]).clip(area)
+        tile = self.source.subsurface(bounds).copy()
+        tile.set_colorkey(COLORKEY, pygame.RLEACCEL)
+        return bounds.topleft, tile
+
+    def patch(self, area):
+        # Repaint one area of the source from the members still in it and
+        # rebuild the tiles over it
+        self.source.set_clip(area)
+        self.source.fill(COLORKEY)
+        for sprite, rect in self.members.items():
+            if rect.colliderect(area):
+                self.source.blit(sprite.image, rect)
+        self.source.set_clip(None)
+        last = min((area.right - 1) // STRIP_TILE_WIDTH, len(self.tiles) - 1)
+        for column in range(max(area.left // STRIP_TILE_WIDTH, 0), last + 1):
+            self.tiles[column] = self.build_tile(column)
+
+    def erase(self, sprite):
+        # Called when a member leaves its group (collected, broken or
+        # scrolled off). Parts more than a scroll step past the left edge
+        # are never shown again, even interpolated, and are not repainted.
+        rect = self.members.pop(sprite)
+        sprite.strip = None
+        if self.source is not None and self.left + rect.right + self.speed > 0:
+            self.patch(rect)
+
+    def redraw(self, sprite):
+        # A member's image changed (an activated checkpoint)
+        if self.source is not None:
+            self.patch(self.members[sprite])
+
+    def release(self):
+        for sprite in self.members:
+            sprite.strip = None
+        self.members.clear()
+        self.source = None
+        self.tiles = []
+
+class StripRenderer:
+    def __init__(self, level):
+        self.level = level
+        self.strips = {layer: [] for layer in LAYERS}
+
+    def offset(self):
+        return self.level.platforms.offset
+
+    def add_chunk(self, platforms, coins, checkpoints):
+        # Disappearing platforms blink on their own timer and stay sprites.
+        # Loose platforms are drawn after the strips, so a platform that
+        # overlaps one drawn before it stays loose as well.
+        chunk = set(platforms)
+        loose = [platform for platform in self.level.platforms if platform.strip is None and platform not in chunk]
+        static = []
+        for platform in platforms:
+            if platform.platform_type == "disappearing" or platform.rect.collidelist([other.rect for other in loose]) != -1:
+                loose.append(platform)
+            else:
+                static.append(platform)
+        
+        for layer, sprites in zip(LAYERS, (static, coins, checkpoints)):
+            if sprites:
+                self.strips[layer].append(ChunkStrip(self, sprites))
+
+    def visible(self, layer):
+        # Strips on screen; emptied strips and strips past the left edge
+        # are dropped here
+        strips = self.strips[layer]
+        if any(not strip.members or strip.right < 0 for strip in strips):
+            for strip in strips:
+                if not strip.members or strip.right < 0:
+                    strip.release()
+            strips[:] = [strip for strip in strips if strip.members]
+        return [strip for strip in strips if strip.left < SCREEN_WIDTH]
+
+    def draw(self, screen, layer, lag=0.0):
+        # Strips due on screen soon are composited ahead, one per layer a frame, so
+        # a new chunk is built a layer at a time as it approaches
+        for strip in self.strips[layer]:
+            if strip.source is None and strip.left < SCREEN_WIDTH * 2:
+                strip.composite()
+                break
+        
+        blits = []
+        for strip in self.visible(layer):
+            if strip.source is None:
+                strip.composite()
+            left = strip.left + round(strip.speed * lag)
+            for tile in strip.tiles:
+                if tile is not None:
+                    (x, y), surface = tile
+                    if -surface.get_width() < left + x < SCREEN_WIDTH:
+                        blits.append((surface, (left + x, strip.top + y)))
+        screen.blits(blits, doreturn=False)
+
+    def clear(self):
+        for strips in self.strips.values():
+            for strip in strips:
+                strip.release()
+            strips.clear()
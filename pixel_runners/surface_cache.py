@@ -0,0 +1,68 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+# Breakable platforms and fire obstacles pick one of this many crack/flame
+# layouts instead of drawing a fresh random one per sprite
+RANDOM_VARIANTS = 4
+
+# Generated graphics kept in memory before the least recently used are dropped
+SURFACE_CACHE_BUDGET = 32 * 1024 * 1024  # bytes
+
+class SurfaceCache:
+    # Shared surfaces for generated entity graphics, keyed by
+    # (entity type, size, variant). Cached surfaces are shared between
+    # sprites, so they must never be drawn on after creation.
+    def __init__(self, budget=SURFACE_CACHE_BUDGET):
+        self.budget = budget
+        self.surfaces = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, kind, size, variant, build):
+        key = (kind, tuple(size), variant)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.to_display_format(build())
+        self.surfaces[key] = surface
+        self.bytes += self.surface_bytes(surface)
+
+        while self.bytes > self.budget and len(self.surfaces) > 1:
+            _, evicted = self.surfaces.popitem(last=False)
+            self.bytes -= self.surface_bytes(evicted)
+            self.evictions += 1
+
+        return surface
+
+    def to_display_format(self, surface):
+        # convert_alpha() needs a display mode; headless runs keep the raw surface
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            return surface.convert_alpha()
+        return surface
+
+    def surface_bytes(self, surface):
+        return surface.get_pitch() * surface.get_height()
+
+    def clear(self):
+        self.surfaces.clear()
+        self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.surfaces),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+surface_cache = SurfaceCache()
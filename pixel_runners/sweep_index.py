@@ -0,0 +1,87 @@
+import bisect
+
+class SweepLane:
+    # Sprites that scroll at one speed, sorted by world x (screen x plus the
+    # distance the lane has scrolled). Scrolling moves them all together, so
+    # their world x and their order never change while they are in the lane.
+    def __init__(self, speed):
+        self.speed = speed
+        self.offset = 0
+        self.lefts = []
+        self.sprites = []
+        self.max_width = 0
+
+class SweepIndex:
+    # Sweep-and-prune index over the sprites players can touch (coins,
+    # checkpoints, power-ups, obstacles). Groups add and remove sprites as
+    # they join and leave, so the index is kept sorted incrementally; a
+    # query binary-searches each lane to the sprites whose x range overlaps
+    # the rect and only tests those, instead of scanning every group.
+    #
+    # Sprites whose x does not follow a fixed whole-pixel scroll (horizontal
+    # oscillators, fractional speeds) are kept loose and tested by every query.
+    def __init__(self, kinds):
+        self.ranks = {kind: rank for rank, kind in enumerate(kinds)}
+        self.lanes = {}
+        self.loose = {}
+        self.entries = {}  # sprite -> (kind, sequence, lane, world x)
+        self.sequence = 0
+
+    def add(self, sprite, kind):
+        self.sequence += 1
+        speed = sprite.speed
+        if (getattr(sprite, "motion", None) == "oscillate" and not sprite.vertical) or speed != int(speed):
+            self.loose[sprite] = None
+            self.entries[sprite] = (kind, self.sequence, None, None)
+            return
+
+        lane = self.lanes.get(speed)
+        if lane is None:
+            lane = self.lanes[speed] = SweepLane(speed)
+        left = sprite.rect.x + lane.offset
+        i = bisect.bisect_right(lane.lefts, left)
+        lane.lefts.insert(i, left)
+        lane.sprites.insert(i, sprite)
+        lane.max_width = max(lane.max_width, sprite.rect.width)
+        self.entries[sprite] = (kind, self.sequence, lane, left)
+
+    def remove(self, sprite):
+        _, _, lane, left = self.entries.pop(sprite)
+        if lane is None:
+            del self.loose[sprite]
+            return
+        i = bisect.bisect_left(lane.lefts, left)
+        while lane.sprites[i] is not sprite:
+            i += 1
+        del lane.lefts[i]
+        del lane.sprites[i]
+
+    def advance(self):
+        # Called once per level update, after the groups moved
+        for lane in self.lanes.values():
+            lane.offset += lane.speed
+
+    def query(self, rect):
+        # (kind, sprite) for every sprite colliding with rect, by kind in the
+        # order given to the index and then in the order the sprites were
+        # added, which is the order spritecollide finds them in each group
+        hits = []
+        for lane in self.lanes.values():
+            lefts = lane.lefts
+            start = bisect.bisect_right(lefts, rect.left + lane.offset - lane.max_width)
+            end = bisect.bisect_left(lefts, rect.right + lane.offset, start)
+            for sprite in lane.sprites[start:end]:
+                if rect.colliderect(sprite.rect):
+                    hits.append(sprite)
+        for sprite in self.loose:
+            if rect.colliderect(sprite.rect):
+                hits.append(sprite)
+
+        entries = self.entries
+        ranks = self.ranks
+        if len(hits) > 1:
+            hits.sort(key=lambda sprite: (ranks[entries[sprite][0]], entries[sprite][1]))
+        return [(entries[sprite][0], sprite) for sprite in hits]
+
+    def __len__(self):
+        return len(self.entries)
@@ -0,0 +1,42 @@
+from spatial_hash import PlatformGroup
+
+# Continuous (swept AABB) collision for the player. The discrete resolver in
+# Player.move_discrete only tests where a move ends, so a move longer than
+# the player plus a platform skips straight over it. Here each axis of a
+# move is tested along its whole path: platforms the end position overlaps
+# (as in the discrete resolver) and platforms whose near face the move
+# crossed both stop it, and the face met first wins.
+#
+# Platforms do not move during a player's update (the level scrolls them
+# afterwards), so sweeping the player alone gives the relative motion.
+
+def platforms_touching(box, platforms):
+    if isinstance(platforms, PlatformGroup):
+        platforms = platforms.query(box)
+    return [platform.rect for platform in platforms if box.colliderect(platform.rect)]
+
+def sweep(start, end, velocity, platforms, horizontal):
+    # The face that stops a move from start to end along one axis, as the
+    # x (horizontal) or y the player's leading side should be set to; None
+    # if nothing is in the way. velocity gives the direction, as in the
+    # discrete resolver, so an embedded player is pushed out even when the
+    # move itself was rounded away.
+    if velocity == 0:
+        return None
+    forward = velocity > 0
+    if horizontal:
+        leading, face = ("right", "left") if forward else ("left", "right")
+    else:
+        leading, face = ("bottom", "top") if forward else ("top", "bottom")
+
+    start_edge = getattr(start, leading)
+    stops = []
+    for rect in platforms_touching(start.union(end), platforms):
+        edge = getattr(rect, face)
+        crossed = edge >= start_edge if forward else edge <= start_edge
+        if crossed or end.colliderect(rect):
+            stops.append(edge)
+
+    if not stops:
+        return None
+    return min(stops) if forward else max(stops)
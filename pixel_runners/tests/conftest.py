@@ -0,0 +1,18 @@
+import os
+import sys
+
+# Tests run headless, importing the game modules the way main.py does
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pytest
+import game_clock
+from settings import *
+
+@pytest.fixture
+def simulated_clock():
+    # One physics tick per advance(), restored afterwards
+    clock = game_clock.SimulatedClock(1000 / PHYSICS_TICK_RATE)
+    previous_clock = game_clock.set_clock(clock)
+    yield clock
+    game_clock.set_clock(previous_clock)
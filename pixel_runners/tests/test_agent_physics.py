@@ -0,0 +1,98 @@
+import random
+import numpy as np
+import pygame
+import pytest
+from settings import *
+import game_clock
+from agent_physics import AgentBatch
+from chunk_generator import Chunk
+from controls import KeyState
+from level import Level
+from player import Player
+
+AGENTS = 40
+TICKS = 1000
+KEYS = (pygame.K_a, pygame.K_d, pygame.K_w, pygame.K_LSHIFT)
+
+class HeldKeys:
+    def __init__(self):
+        self.keys = KeyState()
+
+    def get_pressed(self):
+        return self.keys
+
+def busy_level(level_index, seed):
+    # A level dense with everything players touch
+    level_data = dict(LEVELS[level_index], platform_density=0.9, coin_density=0.9,
+                      powerup_density=0.5, obstacle_density=0.5)
+    random.seed(seed)
+    return Level(level_data, seed=seed, threaded=False)
+
+def spawn_extras(level, rng):
+    # Platforms, coins, an obstacle and a power-up right on screen
+    chunk = Chunk(-1, 0, SCREEN_WIDTH)
+    for _ in range(3):
+        chunk.platforms.append((rng.randint(0, 1200), rng.randint(150, 600), rng.randint(60, 300),
+                                rng.randint(20, 40), "normal"))
+        chunk.coins.append((rng.randint(0, 1200), rng.randint(150, 600)))
+    chunk.obstacles.append((rng.randint(0, 1200), rng.randint(150, 600), 40, 30, "moving_platform", 80, 2,
+                            rng.random() < 0.5))
+    level.spawn_chunk(chunk)
+    level.spawn_powerup(rng.randint(0, 1200), rng.randint(300, 600),
+                        rng.choice(["speed_boost", "high_jump", "slow_motion"]))
+
+def run(level_index, seed, use_agents):
+    # Per-tick state of every agent, driven by the same random held keys
+    level = busy_level(level_index, seed)
+    keys = np.random.default_rng(seed)
+    rng = random.Random(seed)
+    starts = [(50 + 20 * i, 100 + (i * 37) % 500) for i in range(AGENTS)]
+    if use_agents:
+        agents = AgentBatch(starts)
+    else:
+        players = [Player(x, y, 1) for x, y in starts]
+        for player in players:
+            player.controls = HeldKeys()
+
+    trace = []
+    try:
+        for tick in range(TICKS):
+            if tick % 12 == 0:
+                held = keys.random((AGENTS, 4)) < 0.3
+            if tick % 40 == 0:
+                spawn_extras(level, rng)
+
+            if use_agents:
+                agents.step(level.platforms, held[:, 0], held[:, 1], held[:, 2], held[:, 3])
+                level.update([])
+                agents.collide_level(level)
+                trace.append([(int(agents.x[i]), int(agents.y[i]), float(agents.velocity_y[i]),
+                               bool(agents.on_ground[i]), int(agents.score[i]), int(agents.coins[i]),
+                               int(agents.checkpoints[i]), int(agents.collisions[i]), float(agents.speed[i]),
+                               float(agents.jump_power[i]), bool(agents.dashing[i])) for i in range(AGENTS)])
+            else:
+                for i, player in enumerate(players):
+                    player.controls.keys = KeyState(key for key, down in zip(KEYS, held[i]) if down)
+                    player.update(level.platforms)
+                level.update(players)
+                trace.append([(player.rect.x, player.rect.y, player.direction.y, player.on_ground, player.score,
+                               player.coins, player.checkpoints, player.collisions, player.speed,
+                               player.jump_power, player.dashing) for player in players])
+            game_clock.get_clock().advance()
+    finally:
+        level.close()
+    return trace
+
+@pytest.mark.parametrize("level_index", range(len(LEVELS)))
+def test_agents_follow_players(simulated_clock, level_index):
+    players = run(level_index, level_index, use_agents=False)
+    simulated_clock.ticks = 0
+    agents = run(level_index, level_index, use_agents=True)
+    for tick, (expected, actual) in enumerate(zip(players, agents)):
+        assert actual == expected, f"tick {tick}"
+
+    # The run exercised jumps, dashes, power-ups and pickups
+    states = [state for frame in players for state in frame]
+    assert any(state[10] for state in states)
+    assert any(state[8] != PLAYER_SPEED or state[9] != PLAYER_JUMP_POWER for state in states)
+    assert sum(state[5] for state in players[-1]) > 0
@@ -0,0 +1,48 @@
+import random
+import pygame
+import pytest
+from settings import *
+import game_clock
+from benchmark import make_level, make_player
+from spatial_hash import PlatformGroup, colliding_platforms
+
+TICKS = 600
+
+@pytest.mark.parametrize("level_index", range(len(LEVELS)))
+def test_query_matches_testing_every_platform(simulated_clock, level_index):
+    level = make_level(LEVELS[level_index], 1000, level_index)
+    rng = random.Random(level_index)
+    assert isinstance(level.platforms, PlatformGroup)
+    try:
+        for _ in range(TICKS):
+            level.update([])
+            game_clock.get_clock().advance()
+            for _ in range(5):
+                rect = pygame.Rect(rng.randint(-60, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT - 80),
+                                   rng.randint(1, 300), rng.randint(1, 200))
+                expected = [platform for platform in level.platforms if rect.colliderect(platform.rect)]
+                assert list(colliding_platforms(rect, level.platforms)) == expected
+    finally:
+        level.close()
+
+def player_trace(level_index, indexed):
+    # A running, jumping player, colliding through the grid or through a
+    # plain list of the same platforms in the same order
+    game_clock.get_clock().ticks = 0
+    random.seed(level_index)
+    level = make_level(LEVELS[level_index], 1000, level_index)
+    player = make_player()
+    trace = []
+    try:
+        for _ in range(TICKS):
+            player.update(level.platforms if indexed else list(level.platforms))
+            level.update([player])
+            game_clock.get_clock().advance()
+            trace.append((player.rect.topleft, player.direction.y, player.on_ground))
+    finally:
+        level.close()
+    return trace
+
+@pytest.mark.parametrize("level_index", range(len(LEVELS)))
+def test_player_collides_the_same_through_the_grid(simulated_clock, level_index):
+    assert player_trace(level_index, True) == player_trace(level_index, False)
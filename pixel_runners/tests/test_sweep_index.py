@@ -0,0 +1,36 @@
+import random
+import pygame
+import pytest
+from settings import *
+import game_clock
+from benchmark import make_level
+from level import CONTACT_KINDS
+
+TICKS = 600
+
+def spritecollide_contacts(level, rect):
+    # What Level.update found before the index: each group in turn, in
+    # group order
+    probe = pygame.sprite.Sprite()
+    probe.rect = rect
+    return [(kind, sprite) for kind in CONTACT_KINDS
+            for sprite in pygame.sprite.spritecollide(probe, getattr(level, kind), False)]
+
+@pytest.mark.parametrize("level_index", range(len(LEVELS)))
+def test_query_matches_spritecollide(simulated_clock, level_index):
+    level = make_level(LEVELS[level_index], 1000, level_index)
+    rng = random.Random(level_index)
+    hits = 0
+    try:
+        for _ in range(TICKS):
+            level.update([])
+            game_clock.get_clock().advance()
+            for _ in range(5):
+                rect = pygame.Rect(rng.randint(-60, SCREEN_WIDTH), rng.randint(0, SCREEN_HEIGHT - 80),
+                                   rng.randint(1, 200), rng.randint(1, 200))
+                expected = spritecollide_contacts(level, rect)
+                assert level.contacts.query(rect) == expected
+                hits += len(expected)
+    finally:
+        level.close()
+    assert hits > 0
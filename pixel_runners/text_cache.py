@@ -0,0 +1,47 @@
+import pygame
+from collections import OrderedDict
+from settings import *
+
+# Rendered strings kept before the least recently used are dropped
+TEXT_CACHE_SIZE = 512
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, text, color, antialias).
+    # Surfaces are shared, so callers must only blit them.
+    def __init__(self, max_entries=TEXT_CACHE_SIZE):
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        key = (font, text, tuple(color), antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.surfaces),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+text_cache = TextCache()
+
+def render_text(font, text, color, antialias=True):
+    return text_cache.render(font, text, color, antialias)
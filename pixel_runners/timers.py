@@ -0,0 +1,58 @@
+import heapq
+import game_clock
+
+class Timer:
+    # Handle for one scheduled callback; cancel() stops it from firing
+    __slots__ = ("due", "callback", "args", "cancelled")
+
+    def __init__(self, due, callback, args):
+        self.due = due
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+class TimerQueue:
+    # Callbacks due at a game clock time (power-up expiry, the end of a dash,
+    # the next blink of a disappearing platform), kept in a heap ordered by
+    # due time and then by scheduling order. run() fires the ones that are
+    # due, so a frame costs one comparison plus one pop per timer that fires,
+    # however many timers are pending.
+    #
+    # Times come from game_clock, so the queue follows the real clock and a
+    # simulated clock alike. Cancelled timers stay in the heap until their
+    # time comes and are dropped then.
+    def __init__(self):
+        self.heap = []
+        self.sequence = 0
+
+    def schedule_at(self, due, callback, *args):
+        timer = Timer(due, callback, args)
+        heapq.heappush(self.heap, (due, self.sequence, timer))
+        self.sequence += 1
+        return timer
+
+    def schedule(self, delay, callback, *args):
+        # Milliseconds from now
+        return self.schedule_at(game_clock.get_ticks() + delay, callback, *args)
+
+    def run(self, now=None):
+        # Fire every timer due by now, earliest first. Callbacks may schedule
+        # new timers; ones already due fire in the same run.
+        if now is None:
+            now = game_clock.get_ticks()
+        heap = self.heap
+        while heap and heap[0][0] <= now:
+            timer = heapq.heappop(heap)[2]
+            if not timer.cancelled:
+                timer.callback(*timer.args)
+
+    def clear(self):
+        for _, _, timer in self.heap:
+            timer.cancel()
+        self.heap.clear()
+
+    def __len__(self):
+        return len(self.heap)
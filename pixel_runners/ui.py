@@ -1,66 +1,114 @@
 import pygame
 from settings import *
+from surface_cache import surface_cache
+from text_cache import render_text
+from fonts import get_font
+
+class PlayerPanel:
+    # Pre-rendered HUD box for one player. The panel is only redrawn when
+    # one of the stats it shows changes; otherwise drawing it is one blit.
+    def __init__(self, font):
+        self.font = font
+        self.stats = None
+        self.surface = None
+    
+    def draw(self, screen, player, position):
+        stats = (player.player_id, player.score, player.coins, player.checkpoints,
+                 tuple(player.active_powerups))
+        if stats != self.stats:
+            self.stats = stats
+            self.surface = self.render(player)
+        
+        screen.blit(self.surface, position)
+    
+    def render(self, player):
+        # Power-up labels start inside the box and may run below it
+        powerup_count = len(player.active_powerups)
+        height = 100
+        if powerup_count:
+            height = max(height, 70 + (powerup_count - 1) * 25 + self.font.get_linesize())
+        surface = pygame.Surface((350, height), pygame.SRCALPHA)
+        
+        # Player info background
+        pygame.draw.rect(surface, BLACK, (0, 0, 350, 100), border_radius=10)
+        pygame.draw.rect(surface, WHITE, (0, 0, 350, 100), width=2, border_radius=10)
+        
+        # Player name and score
+        player_text = f"Player {player.player_id}"
+        player_color = RED if player.player_id == 1 else BLUE
+        surface.blit(render_text(self.font, player_text, player_color), (10, 10))
+        
+        # Score
+        surface.blit(render_text(self.font, f"Score: {player.score}", WHITE), (10, 40))
+        
+        # Coins
+        surface.blit(render_text(self.font, f"Coins: {player.coins}", YELLOW), (130, 40))
+        
+        # Checkpoints
+        surface.blit(render_text(self.font, f"CP: {player.checkpoints}", GREEN), (230, 40))
+        
+        # Active power-ups
+        powerup_y = 70
+        for powerup_type in player.active_powerups:
+            color = BLUE
+            if powerup_type == "high_jump":
+                color = GREEN
+            elif powerup_type == "slow_motion":
+                color = PURPLE
+            
+            powerup_text = f"{powerup_type.replace('_', ' ').title()}"
+            surface.blit(render_text(self.font, powerup_text, color), (10, powerup_y))
+            powerup_y += 25
+        
+        return surface_cache.to_display_format(surface)
 
 class UI:
     def __init__(self):
-        self.font = pygame.font.SysFont('Arial', 24)
-        self.title_font = pygame.font.SysFont('Arial', 48, bold=True)
-        self.menu_font = pygame.font.SysFont('Arial', 36)
+        # HUD panels by screen slot, and the game over overlay, built on first use
+        self.panels = {}
+        self.overlay = None
+    
+    # Fonts come from the shared registry the first time something is drawn
+    @property
+    def font(self):
+        return get_font(24)
+    
+    @property
+    def title_font(self):
+        return get_font(48, bold=True)
+    
+    @property
+    def menu_font(self):
+        return get_font(36)
+    
+    def hud_rects(self, players):
+        # Screen areas covered by the HUD panels
+        rects = []
+        for i, player in enumerate(players):
+            panel = self.panels.get(i)
+            size = panel.surface.get_size() if panel and panel.surface else (350, 100)
+            rects.append(pygame.Rect((20 + i * 400, 20), size))
+        return rects
     
     def draw_player_stats(self, screen, players):
         for i, player in enumerate(players):
-            # Player info background
-            pygame.draw.rect(screen, BLACK, (20 + i * 400, 20, 350, 100), border_radius=10)
-            pygame.draw.rect(screen, WHITE, (20 + i * 400, 20, 350, 100), width=2, border_radius=10)
-            
-            # Player name and score
-            player_text = f"Player {player.player_id}"
-            player_color = RED if player.player_id == 1 else BLUE
-            player_name = self.font.render(player_text, True, player_color)
-            screen.blit(player_name, (30 + i * 400, 30))
-            
-            # Score
-            score_text = f"Score: {player.score}"
-            score_surf = self.font.render(score_text, True, WHITE)
-            screen.blit(score_surf, (30 + i * 400, 60))
-            
-            # Coins
-            coins_text = f"Coins: {player.coins}"
-            coins_surf = self.font.render(coins_text, True, YELLOW)
-            screen.blit(coins_surf, (150 + i * 400, 60))
-            
-            # Checkpoints
-            checkpoint_text = f"CP: {player.checkpoints}"
-            checkpoint_surf = self.font.render(checkpoint_text, True, GREEN)
-            screen.blit(checkpoint_surf, (250 + i * 400, 60))
-            
-            # Active power-ups
-            powerup_y = 90
-            for powerup_type in player.active_powerups:
-                color = BLUE
-                if powerup_type == "high_jump":
-                    color = GREEN
-                elif powerup_type == "slow_motion":
-                    color = PURPLE
-                
-                powerup_text = f"{powerup_type.replace('_', ' ').title()}"
-                powerup_surf = self.font.render(powerup_text, True, color)
-                screen.blit(powerup_surf, (30 + i * 400, powerup_y))
-                powerup_y += 25
+            if i not in self.panels:
+                self.panels[i] = PlayerPanel(self.font)
+            self.panels[i].draw(screen, player, (20 + i * 400, 20))
     
     def draw_menu(self, screen, selected_option=0, options=None):
         if options is None:
             options = ["Start Game", "Multiplayer", "Leaderboard", "Quit"]
         
         # Title
-        title_surf = self.title_font.render("PIXEL RUNNERS", True, WHITE)
+        title_surf = render_text(self.title_font, "PIXEL RUNNERS", WHITE)
         title_rect = title_surf.get_rect(center=(SCREEN_WIDTH//2, 150))
         screen.blit(title_surf, title_rect)
         
         # Menu options
         for i, option in enumerate(options):
             color = YELLOW if i == selected_option else WHITE
-            option_surf = self.menu_font.render(option, True, color)
+            option_surf = render_text(self.menu_font, option, color)
             option_rect = option_surf.get_rect(center=(SCREEN_WIDTH//2, 300 + i * 60))
             screen.blit(option_surf, option_rect)
             
@@ -70,14 +118,14 @@ class UI:
     
     def draw_level_select(self, screen, levels, selected_level=0):
         # Title
-        title_surf = self.title_font.render("SELECT LEVEL", True, WHITE)
+        title_surf = render_text(self.title_font, "SELECT LEVEL", WHITE)
         title_rect = title_surf.get_rect(center=(SCREEN_WIDTH//2, 150))
         screen.blit(title_surf, title_rect)
         
         # Level options
         for i, level in enumerate(levels):
             color = YELLOW if i == selected_level else WHITE
-            level_surf = self.menu_font.render(level["name"], True, color)
+            level_surf = render_text(self.menu_font, level["name"], color)
             level_rect = level_surf.get_rect(center=(SCREEN_WIDTH//2, 300 + i * 60))
             screen.blit(level_surf, level_rect)
             
@@ -85,14 +133,16 @@ class UI:
             if i == selected_level:
                 pygame.draw.rect(screen, YELLOW, level_rect.inflate(20, 10), width=3, border_radius=5)
     
-    def draw_game_over(self, screen, players):
+    def draw_game_over(self, screen, players, ranks=()):
         # Background overlay
-        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 200))
-        screen.blit(overlay, (0, 0))
+        if self.overlay is None:
+            self.overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+            self.overlay.fill((0, 0, 0, 200))
+            self.overlay = surface_cache.to_display_format(self.overlay)
+        screen.blit(self.overlay, (0, 0))
         
         # Game Over text
-        game_over_surf = self.title_font.render("GAME OVER", True, WHITE)
+        game_over_surf = render_text(self.title_font, "GAME OVER", WHITE)
         game_over_rect = game_over_surf.get_rect(center=(SCREEN_WIDTH//2, 150))
         screen.blit(game_over_surf, game_over_rect)
         
@@ -100,7 +150,7 @@ class UI:
         for i, player in enumerate(players):
             player_text = f"Player {player.player_id}: {player.score} points"
             player_color = RED if player.player_id == 1 else BLUE
-            player_surf = self.menu_font.render(player_text, True, player_color)
+            player_surf = render_text(self.menu_font, player_text, player_color)
             player_rect = player_surf.get_rect(center=(SCREEN_WIDTH//2, 250 + i * 50))
             screen.blit(player_surf, player_rect)
         
@@ -109,12 +159,20 @@ class UI:
             winner = max(players, key=lambda p: p.score)
             winner_text = f"Player {winner.player_id} Wins!"
             winner_color = RED if winner.player_id == 1 else BLUE
-            winner_surf = self.menu_font.render(winner_text, True, winner_color)
+            winner_surf = render_text(self.menu_font, winner_text, winner_color)
             winner_rect = winner_surf.get_rect(center=(SCREEN_WIDTH//2, 350))
             screen.blit(winner_surf, winner_rect)
         
+        # Where each run places among all recorded runs
+        for i, (player, rank) in enumerate(zip(players, ranks)):
+            rank_text = (f"Player {player.player_id}: #{rank['rank']} of {rank['total'] + 1} overall, "
+                         f"#{rank['level_rank']} on this level, better than {rank['percentile']:.0f}% of runs")
+            rank_surf = render_text(self.font, rank_text, WHITE)
+            rank_rect = rank_surf.get_rect(center=(SCREEN_WIDTH//2, 400 + i * 30))
+            screen.blit(rank_surf, rank_rect)
+        
         # Continue prompt
-        continue_surf = self.font.render("Press SPACE to continue", True, WHITE)
+        continue_surf = render_text(self.font, "Press SPACE to continue", WHITE)
         continue_rect = continue_surf.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT - 100))
         screen.blit(continue_surf, continue_rect)
 
@@ -0,0 +1,86 @@
+import heapq
+import math
+from settings import *
+
+class ViewWindow:
+    # Keeps entities that spawn past the right edge of the active window (the
+    # screen plus VIEW_WINDOW_MARGIN) out of their sprite groups until they
+    # scroll into it. Asleep they are not updated, drawn or collision tested,
+    # so the groups only ever hold what is on or near the screen.
+    #
+    # A sleeper scrolls at a constant speed, so the tick it reaches the window
+    # is known when it falls asleep; a heap keyed on that tick wakes sleepers
+    # in order. On waking an entity is moved to where its skipped updates
+    # would have left it.
+    def __init__(self, margin=VIEW_WINDOW_MARGIN):
+        self.right = SCREEN_WIDTH + margin
+        self.ticks = 0
+        self.sleeping = []  # heap of (wake tick, sequence, sleep tick, sprite, group)
+        self.dormant = []  # (sprite, group) pairs that never reach the window
+        self.sequence = 0
+        self.woken = 0
+
+    def ticks_until_visible(self, sprite):
+        # Updates until the sprite's left edge is inside the window; None if
+        # it never will be
+        motion = getattr(sprite, "motion", None)
+        if motion is None:
+            # Own update(): runs every frame regardless
+            return 0
+        if motion == "oscillate" and not sprite.vertical:
+            # Horizontal oscillators swing about a fixed point instead of scrolling
+            if sprite.start_pos.x - sprite.speed - sprite.move_distance > self.right:
+                return None
+            return 0
+        distance = sprite.rect.left - self.right
+        if distance <= 0:
+            return 0
+        return math.ceil(distance / sprite.speed)
+
+    def add(self, group, sprites):
+        # Spawn sprites into group, or put the ones outside the window to sleep
+        awake = []
+        for sprite in sprites:
+            ticks = self.ticks_until_visible(sprite)
+            if ticks is None:
+                self.dormant.append((sprite, group))
+            elif ticks == 0:
+                awake.append(sprite)
+            else:
+                heapq.heappush(self.sleeping, (self.ticks + ticks, self.sequence, self.ticks, sprite, group))
+                self.sequence += 1
+        group.add(awake)
+
+    def update(self):
+        # Called once per level update, after the groups moved
+        self.ticks += 1
+        sleeping = self.sleeping
+        while sleeping and sleeping[0][0] <= self.ticks:
+            _, _, slept, sprite, group = heapq.heappop(sleeping)
+            self.catch_up(sprite, self.ticks - slept)
+            group.add(sprite)
+            self.woken += 1
+
+    def catch_up(self, sprite, ticks):
+        if sprite.motion == "oscillate":
+            sprite.skip(ticks)
+        elif sprite.speed == int(sprite.speed):
+            sprite.rect.x -= int(sprite.speed) * ticks
+        else:
+            # Rect rounds every step; repeat them to land on the same pixel
+            for _ in range(ticks):
+                sprite.rect.x -= sprite.speed
+
+    def clear(self):
+        # Hand every sleeper back to its group's pool
+        for _, _, _, sprite, group in self.sleeping:
+            if group.pool is not None:
+                group.pool.release(sprite)
+        for sprite, group in self.dormant:
+            if group.pool is not None:
+                group.pool.release(sprite)
+        self.sleeping.clear()
+        self.dormant.clear()
+
+    def __len__(self):
+        return len(self.sleeping) + len(self.dormant)